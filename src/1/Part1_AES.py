@@ -1,4 +1,15 @@
-from typing import List
+from typing import List, Tuple, Optional, Callable
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import modes
+import gcm
+from key_cache import SCHEDULE_CACHE
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed by the *_blocks / *_bulk batch API
+    np = None
 
 class AES:
     # =============================================================================
@@ -77,15 +88,35 @@ class AES:
     }
 
 
-    def __init__(self, key: bytes):
+    #: Block engines selectable on AES(key, engine)
+    ENGINES = ("ttable", "reference", "bitsliced")
+
+
+    def __init__(self, key: bytes, engine: str = "ttable", cache: bool = True):
         """
         Initialize AES instance with the given key.
         :param key: Key as bytes (16, 24, or 32 bytes).
+        :param engine: Block engine ("ttable", "reference" or "bitsliced"). All produce identical output.
+        :param cache: Share the key schedule through key_cache.SCHEDULE_CACHE (False for one-time keys).
         """
+        if engine not in AES.ENGINES:
+            raise ValueError(f"Invalid engine! Choose one of {AES.ENGINES}.")
         self.key = key
-        len_key = len(key)
-        self.expanded_key = self.key_expansion(key)
-        self.Nr = AES.KEY_SIZES[len_key][1]
+        self.engine = engine
+        self.expanded_key, self.decryption_key = SCHEDULE_CACHE.get("aes", key, AES.build_key_schedules, cache)
+        self.Nr = AES.KEY_SIZES[len(key)][1]
+        if engine == "ttable":
+            self._encrypt_block = AES.encrypt_block_ttable
+            self._decrypt_block = AES.decrypt_block_ttable
+            self._decrypt_key = self.decryption_key
+        elif engine == "bitsliced":
+            self._encrypt_block = AES.encrypt_blocks_bitsliced
+            self._decrypt_block = AES.decrypt_blocks_bitsliced
+            self._decrypt_key = self.expanded_key
+        else:
+            self._encrypt_block = AES.encrypt_block
+            self._decrypt_block = AES.decrypt_block
+            self._decrypt_key = self.expanded_key
 
 
     # =============================================================================
@@ -211,6 +242,40 @@ class AES:
 
         return expanded_words
 
+    @staticmethod
+    def build_key_schedules(key: bytes) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """
+        Encryption and decryption key schedules as read-only tuples (the form kept in
+        key_cache.SCHEDULE_CACHE).
+        """
+        expanded_key = AES.key_expansion(key)
+        num_round = AES.KEY_SIZES[len(key)][1]
+        return tuple(expanded_key), tuple(AES.inverse_key_expansion(expanded_key, num_round))
+
+    @staticmethod
+    def inverse_key_expansion(expanded_key: List[int], num_round: int) -> List[int]:
+        """
+        Build the decryption key schedule of the FIPS-197 equivalent inverse cipher.
+        Round keys are taken in reverse order and InvMixColumns is applied to every
+        round key except the first and the last one.
+
+        :return: Decryption key schedule as a list of 32-bit integers (words).
+        """
+        gf_mul = AES.GF_MUL
+        mul_e, mul_b, mul_d, mul_9 = gf_mul[0x0e], gf_mul[0x0b], gf_mul[0x0d], gf_mul[0x09]
+        decryption_key = list(expanded_key[4 * num_round:4 * num_round + 4])
+        for rnd in range(num_round - 1, 0, -1):
+            for word in expanded_key[4 * rnd:4 * rnd + 4]:
+                a, b, c, d = word.to_bytes(4, 'big')
+                decryption_key.append(
+                    ((mul_e[a] ^ mul_b[b] ^ mul_d[c] ^ mul_9[d]) << 24) |
+                    ((mul_9[a] ^ mul_e[b] ^ mul_b[c] ^ mul_d[d]) << 16) |
+                    ((mul_d[a] ^ mul_9[b] ^ mul_e[c] ^ mul_b[d]) << 8) |
+                    (mul_b[a] ^ mul_d[b] ^ mul_9[c] ^ mul_e[d])
+                )
+        decryption_key.extend(expanded_key[0:4])
+        return decryption_key
+
 
     # =============================================================================
     #                      AES ENCRYPTION ROUTINES
@@ -383,10 +448,435 @@ class AES:
 
         return AES.matrix_to_bytes(state)
 
+    # =============================================================================
+    #                      T-TABLE ENGINE (32-BIT COLUMN WORDS)
+    # =============================================================================
+
+    @staticmethod
+    def build_t_tables() -> Tuple[List[int], List[int], List[int], List[int]]:
+        """
+        Build the Te0..Te3 encryption tables.
+        Te0[x] is the column (2*S[x], S[x], S[x], 3*S[x]) packed big-endian, so one lookup
+        performs SubBytes and MixColumns for one byte. Te1..Te3 are its byte rotations,
+        which places each byte in the row ShiftRows moves it to.
+        """
+        te0, te1, te2, te3 = [], [], [], []
+        for x in range(256):
+            s = AES.S_BOX[x]
+            s2 = AES.xtime(s)
+            s3 = s2 ^ s
+            word = (s2 << 24) | (s << 16) | (s << 8) | s3
+            te0.append(word)
+            te1.append(((word >> 8) | (word << 24)) & 0xFFFFFFFF)
+            te2.append(((word >> 16) | (word << 16)) & 0xFFFFFFFF)
+            te3.append(((word >> 24) | (word << 8)) & 0xFFFFFFFF)
+        return te0, te1, te2, te3
+
+    @staticmethod
+    def encrypt_block_ttable(plaintext_block: bytes, expanded_key: List[int], num_round: int) -> bytes:
+        """
+        Encrypt a single 16-byte block with the T-table engine.
+        The state is kept as four 32-bit column words. The state matrix of this class is
+        filled row by row (see bytes_to_matrix), so column c holds bytes c, c+4, c+8, c+12.
+        """
+        te0, te1, te2, te3, sbox = AES.TE0, AES.TE1, AES.TE2, AES.TE3, AES.S_BOX
+        b = plaintext_block
+        rk = expanded_key
+        s0 = ((b[0] << 24) | (b[4] << 16) | (b[8] << 8) | b[12]) ^ rk[0]
+        s1 = ((b[1] << 24) | (b[5] << 16) | (b[9] << 8) | b[13]) ^ rk[1]
+        s2 = ((b[2] << 24) | (b[6] << 16) | (b[10] << 8) | b[14]) ^ rk[2]
+        s3 = ((b[3] << 24) | (b[7] << 16) | (b[11] << 8) | b[15]) ^ rk[3]
+
+        # Splitting all four words with one to_bytes() is cheaper than 12 shift/mask pairs.
+        # aN, bN, cN, dN are the bytes (rows 0..3) of columns s0, s1, s2, s3.
+        middle = iter(rk[4:4 * num_round])
+        for k0, k1, k2, k3 in zip(middle, middle, middle, middle):
+            a0, a1, a2, a3, b0, b1, b2, b3, c0, c1, c2, c3, d0, d1, d2, d3 = \
+                ((s0 << 96) | (s1 << 64) | (s2 << 32) | s3).to_bytes(16, 'big')
+            s0 = te0[a0] ^ te1[b1] ^ te2[c2] ^ te3[d3] ^ k0
+            s1 = te0[b0] ^ te1[c1] ^ te2[d2] ^ te3[a3] ^ k1
+            s2 = te0[c0] ^ te1[d1] ^ te2[a2] ^ te3[b3] ^ k2
+            s3 = te0[d0] ^ te1[a1] ^ te2[b2] ^ te3[c3] ^ k3
+
+        # Last round: SubBytes and ShiftRows only
+        k = 4 * num_round
+        a0, a1, a2, a3, b0, b1, b2, b3, c0, c1, c2, c3, d0, d1, d2, d3 = \
+            ((s0 << 96) | (s1 << 64) | (s2 << 32) | s3).to_bytes(16, 'big')
+        t0 = ((sbox[a0] << 24) | (sbox[b1] << 16) | (sbox[c2] << 8) | sbox[d3]) ^ rk[k]
+        t1 = ((sbox[b0] << 24) | (sbox[c1] << 16) | (sbox[d2] << 8) | sbox[a3]) ^ rk[k + 1]
+        t2 = ((sbox[c0] << 24) | (sbox[d1] << 16) | (sbox[a2] << 8) | sbox[b3]) ^ rk[k + 2]
+        t3 = ((sbox[d0] << 24) | (sbox[a1] << 16) | (sbox[b2] << 8) | sbox[c3]) ^ rk[k + 3]
+
+        a0, a1, a2, a3, b0, b1, b2, b3, c0, c1, c2, c3, d0, d1, d2, d3 = \
+            ((t0 << 96) | (t1 << 64) | (t2 << 32) | t3).to_bytes(16, 'big')
+        return bytes((a0, b0, c0, d0, a1, b1, c1, d1, a2, b2, c2, d2, a3, b3, c3, d3))
+
+    @staticmethod
+    def build_gf_tables() -> Tuple[List[int], List[int], List[bytes]]:
+        """
+        Build the GF(2^8) lookup tables.
+        GF_EXP[i] is 3^i (antilog, 510 entries so GF_EXP[log a + log b] needs no reduction),
+        GF_LOG[a] is log_3(a) (GF_LOG[0] is unused) and GF_MUL[a][b] is a*b.
+
+        :return: (GF_EXP, GF_LOG, GF_MUL)
+        """
+        gf_exp = [0] * 510
+        gf_log = [0] * 256
+        x = 1
+        for i in range(255):
+            gf_exp[i] = gf_exp[i + 255] = x
+            gf_log[x] = i
+            x ^= AES.xtime(x)  # x * 3
+        gf_mul = [bytes(256)]
+        for a in range(1, 256):
+            log_a = gf_log[a]
+            gf_mul.append(bytes([0] + [gf_exp[log_a + gf_log[b]] for b in range(1, 256)]))
+        return gf_exp, gf_log, gf_mul
+
+    @staticmethod
+    def build_inv_t_tables() -> Tuple[List[int], List[int], List[int], List[int]]:
+        """
+        Build the Td0..Td3 decryption tables.
+        Td0[x] is the column (14*Si[x], 9*Si[x], 13*Si[x], 11*Si[x]) packed big-endian,
+        where Si is the inverse S-Box; Td1..Td3 are its byte rotations.
+        """
+        gf_mul = AES.GF_MUL
+        td0, td1, td2, td3 = [], [], [], []
+        for x in range(256):
+            s = AES.INV_S_BOX[x]
+            word = (gf_mul[0x0e][s] << 24) | (gf_mul[0x09][s] << 16) | (gf_mul[0x0d][s] << 8) | gf_mul[0x0b][s]
+            td0.append(word)
+            td1.append(((word >> 8) | (word << 24)) & 0xFFFFFFFF)
+            td2.append(((word >> 16) | (word << 16)) & 0xFFFFFFFF)
+            td3.append(((word >> 24) | (word << 8)) & 0xFFFFFFFF)
+        return td0, td1, td2, td3
+
+    @staticmethod
+    def decrypt_block_ttable(ciphertext_block: bytes, decryption_key: List[int], num_round: int) -> bytes:
+        """
+        Decrypt a single 16-byte block with the equivalent inverse cipher.
+        Takes the schedule from inverse_key_expansion(), not the encryption key schedule.
+        """
+        td0, td1, td2, td3, inv_sbox = AES.TD0, AES.TD1, AES.TD2, AES.TD3, AES.INV_S_BOX
+        b = ciphertext_block
+        rk = decryption_key
+        s0 = ((b[0] << 24) | (b[4] << 16) | (b[8] << 8) | b[12]) ^ rk[0]
+        s1 = ((b[1] << 24) | (b[5] << 16) | (b[9] << 8) | b[13]) ^ rk[1]
+        s2 = ((b[2] << 24) | (b[6] << 16) | (b[10] << 8) | b[14]) ^ rk[2]
+        s3 = ((b[3] << 24) | (b[7] << 16) | (b[11] << 8) | b[15]) ^ rk[3]
+
+        # Same byte naming as encrypt_block_ttable; InvShiftRows takes bytes from the right.
+        middle = iter(rk[4:4 * num_round])
+        for k0, k1, k2, k3 in zip(middle, middle, middle, middle):
+            a0, a1, a2, a3, b0, b1, b2, b3, c0, c1, c2, c3, d0, d1, d2, d3 = \
+                ((s0 << 96) | (s1 << 64) | (s2 << 32) | s3).to_bytes(16, 'big')
+            s0 = td0[a0] ^ td1[d1] ^ td2[c2] ^ td3[b3] ^ k0
+            s1 = td0[b0] ^ td1[a1] ^ td2[d2] ^ td3[c3] ^ k1
+            s2 = td0[c0] ^ td1[b1] ^ td2[a2] ^ td3[d3] ^ k2
+            s3 = td0[d0] ^ td1[c1] ^ td2[b2] ^ td3[a3] ^ k3
+
+        # Last round: InvSubBytes and InvShiftRows only
+        k = 4 * num_round
+        a0, a1, a2, a3, b0, b1, b2, b3, c0, c1, c2, c3, d0, d1, d2, d3 = \
+            ((s0 << 96) | (s1 << 64) | (s2 << 32) | s3).to_bytes(16, 'big')
+        t0 = ((inv_sbox[a0] << 24) | (inv_sbox[d1] << 16) | (inv_sbox[c2] << 8) | inv_sbox[b3]) ^ rk[k]
+        t1 = ((inv_sbox[b0] << 24) | (inv_sbox[a1] << 16) | (inv_sbox[d2] << 8) | inv_sbox[c3]) ^ rk[k + 1]
+        t2 = ((inv_sbox[c0] << 24) | (inv_sbox[b1] << 16) | (inv_sbox[a2] << 8) | inv_sbox[d3]) ^ rk[k + 2]
+        t3 = ((inv_sbox[d0] << 24) | (inv_sbox[c1] << 16) | (inv_sbox[b2] << 8) | inv_sbox[a3]) ^ rk[k + 3]
+
+        a0, a1, a2, a3, b0, b1, b2, b3, c0, c1, c2, c3, d0, d1, d2, d3 = \
+            ((t0 << 96) | (t1 << 64) | (t2 << 32) | t3).to_bytes(16, 'big')
+        return bytes((a0, b0, c0, d0, a1, b1, c1, d1, a2, b2, c2, d2, a3, b3, c3, d3))
+
+    # =============================================================================
+    #                      BITSLICED ENGINE (PYTHON INT BIT-PLANES)
+    # =============================================================================
+    # A batch of blocks is transposed into 128 bit-planes: plane 8*p + k holds bit k
+    # (k = 0 is the most significant bit) of byte p of every block, one block per bit of
+    # the int. SubBytes is a Boolean circuit and the other steps are XORs and plane
+    # reordering, so there are no data-dependent table lookups.
+
+    #: Blocks transposed together by the bitsliced engine
+    BITSLICE_BATCH = 2048
+
+    @staticmethod
+    def _bs_sbox(U0, U1, U2, U3, U4, U5, U6, U7, ones):
+        """
+        S-Box on 8 bit-planes (U0 = most significant bit) with the 113-gate circuit
+        of Boyar and Peralta. `ones` is the all-ones plane used for the XNOR outputs.
+        """
+        T1 = U0 ^ U3; T2 = U0 ^ U5; T3 = U0 ^ U6; T4 = U3 ^ U5; T5 = U4 ^ U6; T6 = T1 ^ T5
+        T7 = U1 ^ U2; T8 = U7 ^ T6; T9 = U7 ^ T7; T10 = T6 ^ T7; T11 = U1 ^ U5; T12 = U2 ^ U5
+        T13 = T3 ^ T4; T14 = T6 ^ T11; T15 = T5 ^ T11; T16 = T5 ^ T12; T17 = T9 ^ T16; T18 = U3 ^ U7
+        T19 = T7 ^ T18; T20 = T1 ^ T19; T21 = U6 ^ U7; T22 = T7 ^ T21; T23 = T2 ^ T22; T24 = T2 ^ T10
+        T25 = T20 ^ T17; T26 = T3 ^ T16; T27 = T1 ^ T12
+
+        M1 = T13 & T6; M2 = T23 & T8; M3 = T14 ^ M1; M4 = T19 & U7; M5 = M4 ^ M1; M6 = T3 & T16
+        M7 = T22 & T9; M8 = T26 ^ M6; M9 = T20 & T17; M10 = M9 ^ M6; M11 = T1 & T15; M12 = T4 & T27
+        M13 = M12 ^ M11; M14 = T2 & T10; M15 = M14 ^ M11; M16 = M3 ^ M2; M17 = M5 ^ T24; M18 = M8 ^ M7
+        M19 = M10 ^ M15; M20 = M16 ^ M13; M21 = M17 ^ M15; M22 = M18 ^ M13; M23 = M19 ^ T25; M24 = M22 ^ M23
+        M25 = M22 & M20; M26 = M21 ^ M25; M27 = M20 ^ M21; M28 = M23 ^ M25; M29 = M28 & M27; M30 = M26 & M24
+        M31 = M20 & M23; M32 = M27 & M31; M33 = M27 ^ M25; M34 = M21 & M22; M35 = M24 & M34; M36 = M24 ^ M25
+        M37 = M21 ^ M29; M38 = M32 ^ M33; M39 = M23 ^ M30; M40 = M35 ^ M36; M41 = M38 ^ M40; M42 = M37 ^ M39
+        M43 = M37 ^ M38; M44 = M39 ^ M40; M45 = M42 ^ M41
+        M46 = M44 & T6; M47 = M40 & T8; M48 = M39 & U7; M49 = M43 & T16; M50 = M38 & T9; M51 = M37 & T17
+        M52 = M42 & T15; M53 = M45 & T27; M54 = M41 & T10; M55 = M44 & T13; M56 = M40 & T23; M57 = M39 & T19
+        M58 = M43 & T3; M59 = M38 & T22; M60 = M37 & T20; M61 = M42 & T1; M62 = M45 & T4; M63 = M41 & T2
+
+        L0 = M61 ^ M62; L1 = M50 ^ M56; L2 = M46 ^ M48; L3 = M47 ^ M55; L4 = M54 ^ M58; L5 = M49 ^ M61
+        L6 = M62 ^ L5; L7 = M46 ^ L3; L8 = M51 ^ M59; L9 = M52 ^ M53; L10 = M53 ^ L4; L11 = M60 ^ L2
+        L12 = M48 ^ M51; L13 = M50 ^ L0; L14 = M52 ^ M61; L15 = M55 ^ L1; L16 = M56 ^ L0; L17 = M57 ^ L1
+        L18 = M58 ^ L8; L19 = M63 ^ L4; L20 = L0 ^ L1; L21 = L1 ^ L7; L22 = L3 ^ L12; L23 = L18 ^ L2
+        L24 = L15 ^ L9; L25 = L6 ^ L10; L26 = L7 ^ L9; L27 = L8 ^ L10; L28 = L11 ^ L14; L29 = L11 ^ L17
+
+        return (L6 ^ L24, L16 ^ L26 ^ ones, L19 ^ L28 ^ ones, L6 ^ L21,
+                L20 ^ L22, L25 ^ L29, L13 ^ L27 ^ ones, L6 ^ L23 ^ ones)
+
+    @staticmethod
+    def _bs_inv_affine(y, ones):
+        """
+        Inverse of the S-Box affine map on 8 bit-planes (MSB first):
+        x = rotl(y, 1) ^ rotl(y, 3) ^ rotl(y, 6) ^ 0x05.
+        """
+        y7, y6, y5, y4, y3, y2, y1, y0 = y
+        return (y6 ^ y4 ^ y1, y5 ^ y3 ^ y0, y4 ^ y2 ^ y7, y3 ^ y1 ^ y6,
+                y2 ^ y0 ^ y5, y1 ^ y7 ^ y4 ^ ones, y0 ^ y6 ^ y3, y7 ^ y5 ^ y2 ^ ones)
+
+    @staticmethod
+    def _bs_inv_sbox(y, ones):
+        """
+        Inverse S-Box on 8 bit-planes, reusing the forward circuit:
+        Si(y) = A^-1(S(A^-1(y))) where A^-1 is the inverse affine map,
+        because S = A o inv and inv is an involution.
+        """
+        return AES._bs_inv_affine(AES._bs_sbox(*AES._bs_inv_affine(y, ones), ones), ones)
+
+    @staticmethod
+    def _bs_xtime(a):
+        """
+        Multiply 8 bit-planes (MSB first) by 2 in GF(2^8).
+        """
+        return (a[1], a[2], a[3], a[4] ^ a[0], a[5] ^ a[0], a[6], a[7] ^ a[0], a[0])
+
+    @staticmethod
+    def _bs_mix_columns(planes):
+        """
+        MixColumns on bit-planes: out_r = a_r ^ t ^ 2*(a_r ^ a_r+1) with t = a0^a1^a2^a3.
+        """
+        xtime = AES._bs_xtime
+        out = [0] * 128
+        for c in range(4):
+            rows = [planes[8 * (4 * r + c):8 * (4 * r + c) + 8] for r in range(4)]
+            t = [rows[0][k] ^ rows[1][k] ^ rows[2][k] ^ rows[3][k] for k in range(8)]
+            for r in range(4):
+                a, b = rows[r], rows[(r + 1) % 4]
+                doubled = xtime([a[k] ^ b[k] for k in range(8)])
+                base = 8 * (4 * r + c)
+                for k in range(8):
+                    out[base + k] = a[k] ^ t[k] ^ doubled[k]
+        return out
+
+    @staticmethod
+    def _bs_inv_mix_columns(planes):
+        """
+        InvMixColumns on bit-planes as MixColumns after a cheap pre-step:
+        a0 ^= 4*(a0^a2), a2 ^= 4*(a0^a2), a1 ^= 4*(a1^a3), a3 ^= 4*(a1^a3).
+        """
+        xtime = AES._bs_xtime
+        pre = list(planes)
+        for c in range(4):
+            for r in (0, 1):
+                lo, hi = 8 * (4 * r + c), 8 * (4 * (r + 2) + c)
+                u = xtime(xtime([pre[lo + k] ^ pre[hi + k] for k in range(8)]))
+                for k in range(8):
+                    pre[lo + k] ^= u[k]
+                    pre[hi + k] ^= u[k]
+        return AES._bs_mix_columns(pre)
+
+    @staticmethod
+    def _bs_shift_rows(planes, inverse: bool = False):
+        """
+        (Inv)ShiftRows as a reordering of the byte positions (row-major, see bytes_to_matrix).
+        """
+        out = []
+        for r in range(4):
+            for c in range(4):
+                src = 4 * r + ((c - r) % 4 if inverse else (c + r) % 4)
+                out.extend(planes[8 * src:8 * src + 8])
+        return out
+
+    @staticmethod
+    def _bs_add_round_key(planes, expanded_key: List[int], round_idx: int, ones: int) -> None:
+        """
+        XOR the all-ones plane into every plane whose round key bit is set.
+        """
+        for c in range(4):
+            word = expanded_key[round_idx * 4 + c]
+            for r in range(4):
+                byte = (word >> (24 - 8 * r)) & 0xff
+                base = 8 * (4 * r + c)
+                for k in range(8):
+                    if (byte >> (7 - k)) & 1:
+                        planes[base + k] ^= ones
+
+    @staticmethod
+    def _bs_pack(data: bytes, count: int):
+        """
+        Transpose `count` blocks into 128 bit-planes.
+        Blocks are split into 8 equal lanes of n blocks; block i of lane g is bit 8*i + g
+        of every plane, which lets each byte column be moved with one int.from_bytes().
+
+        :return: (planes, n)
+        """
+        n = -(-count // 8)
+        data = bytes(data) + bytes(16 * (8 * n - count))
+        lane = 16 * n
+        spread = int.from_bytes(b'\x01' * n, 'little')
+        planes = []
+        for p in range(16):
+            columns = [int.from_bytes(data[g * lane + p:(g + 1) * lane:16], 'little') for g in range(8)]
+            for k in range(8):
+                bit = 7 - k
+                plane = 0
+                for g, column in enumerate(columns):
+                    plane |= ((column >> bit) & spread) << g
+                planes.append(plane)
+        return planes, n
+
+    @staticmethod
+    def _bs_unpack(planes, n: int, count: int) -> bytes:
+        """
+        Inverse of _bs_pack().
+        """
+        lane = 16 * n
+        spread = int.from_bytes(b'\x01' * n, 'little')
+        out = bytearray(8 * lane)
+        for p in range(16):
+            byte_planes = planes[8 * p:8 * p + 8]
+            for g in range(8):
+                column = 0
+                for k, plane in enumerate(byte_planes):
+                    column |= ((plane >> g) & spread) << (7 - k)
+                out[g * lane + p:(g + 1) * lane:16] = column.to_bytes(n, 'little')
+        return bytes(out[:16 * count])
+
+    @staticmethod
+    def _bs_encrypt_batch(data: bytes, expanded_key: List[int], num_round: int) -> bytes:
+        count = len(data) // 16
+        planes, n = AES._bs_pack(data, count)
+        ones = (1 << (8 * n)) - 1
+        sbox = AES._bs_sbox
+        AES._bs_add_round_key(planes, expanded_key, 0, ones)
+        for rnd in range(1, num_round + 1):
+            substituted = []
+            for p in range(0, 128, 8):
+                substituted.extend(sbox(*planes[p:p + 8], ones))
+            planes = AES._bs_shift_rows(substituted)
+            if rnd != num_round:
+                planes = AES._bs_mix_columns(planes)
+            AES._bs_add_round_key(planes, expanded_key, rnd, ones)
+        return AES._bs_unpack(planes, n, count)
+
+    @staticmethod
+    def _bs_decrypt_batch(data: bytes, expanded_key: List[int], num_round: int) -> bytes:
+        count = len(data) // 16
+        planes, n = AES._bs_pack(data, count)
+        ones = (1 << (8 * n)) - 1
+        inv_sbox = AES._bs_inv_sbox
+        AES._bs_add_round_key(planes, expanded_key, num_round, ones)
+        for rnd in range(num_round - 1, -1, -1):
+            planes = AES._bs_shift_rows(planes, inverse=True)
+            substituted = []
+            for p in range(0, 128, 8):
+                substituted.extend(inv_sbox(planes[p:p + 8], ones))
+            planes = substituted
+            AES._bs_add_round_key(planes, expanded_key, rnd, ones)
+            if rnd != 0:
+                planes = AES._bs_inv_mix_columns(planes)
+        return AES._bs_unpack(planes, n, count)
+
+    @staticmethod
+    def encrypt_blocks_bitsliced(data: bytes, expanded_key: List[int], num_round: int) -> bytes:
+        """
+        Encrypt whole 16-byte blocks with the bitsliced engine, BITSLICE_BATCH blocks at a time.
+        Takes the same arguments as encrypt_block and also accepts a single block.
+        """
+        step = 16 * AES.BITSLICE_BATCH
+        return b''.join(AES._bs_encrypt_batch(data[i:i + step], expanded_key, num_round)
+                        for i in range(0, len(data), step))
+
+    @staticmethod
+    def decrypt_blocks_bitsliced(data: bytes, expanded_key: List[int], num_round: int) -> bytes:
+        """
+        Decrypt whole 16-byte blocks with the bitsliced engine (encryption key schedule).
+        """
+        step = 16 * AES.BITSLICE_BATCH
+        return b''.join(AES._bs_decrypt_batch(data[i:i + step], expanded_key, num_round)
+                        for i in range(0, len(data), step))
+
     # =============================================================================
     #                    MULTI-BLOCK ENCRYPT/DECRYPT
     # =============================================================================
 
+    def _stride(self) -> int:
+        """
+        Bytes handed to the block engine per call (the bitsliced engine works on batches).
+        """
+        return 16 * AES.BITSLICE_BATCH if self.engine == "bitsliced" else 16
+
+    def encrypt_into(self, plaintext, out) -> int:
+        """
+        AES encrypt the plaintext into a writable buffer.
+        Blocks are read through a memoryview and written straight into `out`; only the
+        final padded block is built separately.
+
+        :param plaintext: Any bytes-like object.
+        :param out: Writable buffer (bytearray, memoryview, mmap, ...) of at least
+                    len(plaintext) // 16 * 16 + 16 bytes.
+        :return: Number of bytes written.
+        """
+        src = memoryview(plaintext).cast('B')
+        dst = memoryview(out).cast('B')
+        full = len(src) - len(src) % 16
+        total = full + 16
+        if len(dst) < total:
+            raise ValueError(f"Output buffer must hold at least {total} bytes.")
+        padding_length = total - len(src)
+        tail_block = bytes(src[full:]) + bytes([padding_length] * padding_length)
+
+        encrypt_block, expanded_key, num_round = self._encrypt_block, self.expanded_key, self.Nr
+        stride = self._stride()
+        for start in range(0, total, stride):
+            end = min(start + stride, total)
+            if end <= full:
+                dst[start:end] = encrypt_block(src[start:end], expanded_key, num_round)
+            else:
+                dst[start:end] = encrypt_block(bytes(src[start:full]) + tail_block, expanded_key, num_round)
+        return total
+
+    def decrypt_into(self, ciphertext, out) -> int:
+        """
+        AES decrypt the ciphertext into a writable buffer.
+        Trailing bytes that do not fill a whole block are ignored, as in decrypt().
+
+        :param out: Writable buffer of at least len(ciphertext) // 16 * 16 bytes.
+        :return: Length of the plaintext in `out` after removing the PKCS7 padding.
+        """
+        src = memoryview(ciphertext).cast('B')
+        dst = memoryview(out).cast('B')
+        full = len(src) - len(src) % 16
+        if len(dst) < full:
+            raise ValueError(f"Output buffer must hold at least {full} bytes.")
+
+        decrypt_block, decrypt_key, num_round = self._decrypt_block, self._decrypt_key, self.Nr
+        stride = self._stride()
+        for start in range(0, full, stride):
+            end = min(start + stride, full)
+            dst[start:end] = decrypt_block(src[start:end], decrypt_key, num_round)
+        if not full:
+            return 0
+        return full - dst[full - 1]
+
     def encrypt(self, plaintext: bytes) -> bytes:
         """
         AES encrypt the plaintext with the given key.
@@ -394,16 +884,9 @@ class AES:
 
         :return: Ciphertext as bytes.
         """
-        block_size = 16
-        padded_plaintext = AES.pkcs7_pad(plaintext, block_size)
-        num_blocks = len(padded_plaintext) // block_size
-        results = []
-        for i in range(num_blocks):
-            start = i* block_size
-            block = padded_plaintext[start: start+block_size]
-            encrypted_block = AES.encrypt_block(block, self.expanded_key, self.Nr)
-            results.append(encrypted_block)
-        return b''.join(results)
+        out = bytearray(len(plaintext) // 16 * 16 + 16)
+        self.encrypt_into(plaintext, out)
+        return bytes(out)
 
     def decrypt(self, ciphertext: bytes) -> bytes:
         """
@@ -412,16 +895,294 @@ class AES:
 
         :return: Decrypted plaintext as bytes (unpadded).
         """
-        block_size = 16
-        num_blocks = len(ciphertext) // block_size
-        results = []
-        for i in range(num_blocks):
-            start = i * block_size
-            block = ciphertext[start:start + block_size]
-            results.append(AES.decrypt_block(block, self.expanded_key, self.Nr))
-        plaintext = b''.join(results)
+        out = bytearray(len(ciphertext) // 16 * 16)
+        length = self.decrypt_into(ciphertext, out)
+        del out[length:]
+        return bytes(out)
+
+    # =============================================================================
+    #                    STREAMING MODES (ECB / CBC / CTR)
+    # =============================================================================
+
+    def block_functions(self) -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+        """
+        Return (encrypt_block, decrypt_block) bound to this key and engine.
+        Both take and return a single 16-byte block.
+        """
+        encrypt_block, decrypt_block = self._encrypt_block, self._decrypt_block
+        expanded_key, decrypt_key, num_round = self.expanded_key, self._decrypt_key, self.Nr
+        return (lambda block: encrypt_block(block, expanded_key, num_round),
+                lambda block: decrypt_block(block, decrypt_key, num_round))
+
+    def encryptor(self, mode: str, iv: Optional[bytes] = None) -> modes.BlockModeStream:
+        """
+        Streaming encryptor with update()/finalize() (see modes.encryptor).
+        :param mode: "ecb", "cbc" or "ctr".
+        :param iv: 16-byte IV (CBC) or initial counter block (CTR).
+        """
+        return modes.encryptor(mode, *self.block_functions(), 16, iv)
+
+    def decryptor(self, mode: str, iv: Optional[bytes] = None) -> modes.BlockModeStream:
+        """
+        Streaming decryptor with update()/finalize() (see modes.decryptor).
+        """
+        return modes.decryptor(mode, *self.block_functions(), 16, iv)
+
+    # =============================================================================
+    #                    GCM (AUTHENTICATED ENCRYPTION)
+    # =============================================================================
+
+    def encrypt_raw_blocks(self, data: bytes) -> bytes:
+        """
+        Encrypt a concatenation of whole 16-byte blocks without padding or chaining.
+        Lets batching engines (bitsliced) work on many blocks per call.
+        """
+        src = memoryview(data).cast('B')
+        if len(src) % 16:
+            raise ValueError("Data must be a whole number of 16-byte blocks.")
+        out = bytearray(len(src))
+        encrypt_block, expanded_key, num_round = self._encrypt_block, self.expanded_key, self.Nr
+        stride = self._stride()
+        for start in range(0, len(src), stride):
+            out[start:start + stride] = encrypt_block(src[start:start + stride], expanded_key, num_round)
+        return bytes(out)
+
+    def _gcm_hash(self) -> gcm.GHASH:
+        """
+        GHASH tables for H = E_K(0^128), built on first use and kept with the instance.
+        """
+        if getattr(self, "_ghash", None) is None:
+            self._ghash = gcm.GHASH(self.encrypt_raw_blocks(bytes(16)))
+        return self._ghash
+
+    def gcm_encrypt(self, nonce: bytes, plaintext: bytes, associated_data: bytes = b'',
+                    tag_length: int = 16) -> Tuple[bytes, bytes]:
+        """
+        AES-GCM encryption: CTR keystream in batches and table-driven GHASH in one pass.
+
+        :param nonce: Nonce (12 bytes recommended); never reuse one under the same key.
+        :param tag_length: Tag length in bytes, one of gcm.TAG_LENGTHS.
+        :return: (ciphertext, tag)
+        """
+        return gcm.gcm_encrypt(self.encrypt_raw_blocks, self._gcm_hash(), nonce, plaintext,
+                               associated_data, tag_length)
+
+    def gcm_decrypt(self, nonce: bytes, ciphertext: bytes, tag: bytes, associated_data: bytes = b'') -> bytes:
+        """
+        AES-GCM decryption. Raises ValueError if the tag does not verify.
+        """
+        return gcm.gcm_decrypt(self.encrypt_raw_blocks, self._gcm_hash(), nonce, ciphertext, tag,
+                               associated_data)
+
+    # =============================================================================
+    #                    PARALLEL CTR (PROCESS POOL)
+    # =============================================================================
+
+    #: Inputs shorter than this are handled in-process; pool start-up would dominate
+    PARALLEL_CTR_MIN_BYTES = 64 * 1024
+
+    def ctr_parallel(self, data: bytes, iv: bytes, workers: Optional[int] = None,
+                     segment_size: int = 256 * 1024) -> bytes:
+        """
+        CTR encryption/decryption split across worker processes.
+        The input is copied once into a shared memory block that every worker attaches to
+        and builds its own expanded key for; tasks are only (counter block, offset, length)
+        of counter-aligned segments (segment_size is rounded to whole blocks), generated
+        lazily, and each worker transforms its segment in place. Output equals
+        encryptor("ctr", iv).update(data).
+
+        :param iv: 16-byte initial counter block.
+        :param workers: Number of processes (default: os.cpu_count()).
+        """
+        if len(iv) != 16:
+            raise ValueError("Initial counter block must be 16 bytes.")
+        length = len(data)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or length < AES.PARALLEL_CTR_MIN_BYTES:
+            return self.encryptor("ctr", iv).update(data)
+
+        segment_size = max(16, segment_size - segment_size % 16)
+        counter = int.from_bytes(iv, 'big')
+        tasks = (
+            (((counter + start // 16) & 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF).to_bytes(16, 'big'),
+             start, min(segment_size, length - start))
+            for start in range(0, length, segment_size)
+        )
+        memory = shared_memory.SharedMemory(create=True, size=length)
+        try:
+            memory.buf[:length] = data
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_ctr_worker,
+                                     initargs=(self.key, self.engine, memory.name)) as executor:
+                for _ in executor.map(_ctr_segment, tasks):
+                    pass
+            return bytes(memory.buf[:length])
+        finally:
+            memory.close()
+            memory.unlink()
+
+    # =============================================================================
+    #                    NUMPY BATCH ENGINE (N BLOCKS AT ONCE)
+    # =============================================================================
+
+    #: Blocks processed per vectorized call by the *_bulk methods (bounds temporary memory)
+    BULK_BATCH_BLOCKS = 1 << 16
+
+    @staticmethod
+    def _require_numpy() -> None:
+        if np is None:
+            raise ImportError("numpy is required for the batch AES API.")
+
+    @staticmethod
+    def _columns_from_blocks(blocks):
+        """
+        Split an (N,16) uint8 array into the four uint32 column words of every block.
+        """
+        b = blocks.astype(np.uint32)
+        return [(b[:, c] << 24) | (b[:, c + 4] << 16) | (b[:, c + 8] << 8) | b[:, c + 12] for c in range(4)]
+
+    @staticmethod
+    def _blocks_from_columns(columns):
+        """
+        Inverse of _columns_from_blocks().
+        """
+        out = np.empty((len(columns[0]), 16), dtype=np.uint8)
+        for c, word in enumerate(columns):
+            out[:, c] = word >> 24
+            out[:, c + 4] = word >> 16
+            out[:, c + 8] = word >> 8
+            out[:, c + 12] = word
+        return out
+
+    @staticmethod
+    def _batch_rounds(blocks, round_keys, num_round, tables, sbox, order):
+        """
+        Run all rounds on N blocks. order[i] names the source column of the byte that
+        table i reads for output column 0; column j reads (order[i] + j) % 4.
+        """
+        t0, t1, t2, t3 = tables
+        o1, o2, o3 = order
+        s = AES._columns_from_blocks(blocks)
+        s = [s[c] ^ round_keys[c] for c in range(4)]
+        for rnd in range(1, num_round):
+            rk = round_keys[4 * rnd:4 * rnd + 4]
+            s = [
+                t0[s[c] >> 24] ^ t1[(s[(c + o1) % 4] >> 16) & 0xff]
+                ^ t2[(s[(c + o2) % 4] >> 8) & 0xff] ^ t3[s[(c + o3) % 4] & 0xff] ^ rk[c]
+                for c in range(4)
+            ]
+        rk = round_keys[4 * num_round:4 * num_round + 4]
+        s = [
+            ((sbox[s[c] >> 24] << 24) | (sbox[(s[(c + o1) % 4] >> 16) & 0xff] << 16)
+             | (sbox[(s[(c + o2) % 4] >> 8) & 0xff] << 8) | sbox[s[(c + o3) % 4] & 0xff]) ^ rk[c]
+            for c in range(4)
+        ]
+        return AES._blocks_from_columns(s)
+
+    def encrypt_blocks(self, blocks):
+        """
+        Encrypt N blocks at once (no padding, no chaining).
+        Every round is a handful of vectorized table lookups and XORs over all blocks.
+
+        :param blocks: (N,16) uint8 array.
+        :return: (N,16) uint8 array of ciphertext blocks.
+        """
+        AES._require_numpy()
+        round_keys = np.array(self.expanded_key, dtype=np.uint32)
+        return AES._batch_rounds(np.asarray(blocks, dtype=np.uint8), round_keys, self.Nr,
+                                 AES._np_tables["te"], AES._np_tables["sbox"], (1, 2, 3))
+
+    def decrypt_blocks(self, blocks):
+        """
+        Decrypt N blocks at once with the equivalent inverse cipher.
+
+        :param blocks: (N,16) uint8 array.
+        :return: (N,16) uint8 array of plaintext blocks.
+        """
+        AES._require_numpy()
+        round_keys = np.array(self.decryption_key, dtype=np.uint32)
+        return AES._batch_rounds(np.asarray(blocks, dtype=np.uint8), round_keys, self.Nr,
+                                 AES._np_tables["td"], AES._np_tables["inv_sbox"], (3, 2, 1))
+
+    def encrypt_bulk(self, plaintext: bytes) -> bytes:
+        """
+        ECB + PKCS7 encryption through encrypt_blocks(); same output as encrypt().
+        """
+        AES._require_numpy()
+        padded = np.frombuffer(AES.pkcs7_pad(plaintext, 16), dtype=np.uint8).reshape(-1, 16)
+        step = AES.BULK_BATCH_BLOCKS
+        return b''.join(self.encrypt_blocks(padded[i:i + step]).tobytes() for i in range(0, len(padded), step))
+
+    def decrypt_bulk(self, ciphertext: bytes) -> bytes:
+        """
+        ECB + PKCS7 decryption through decrypt_blocks(); same output as decrypt().
+        """
+        AES._require_numpy()
+        blocks = np.frombuffer(ciphertext, dtype=np.uint8, count=len(ciphertext) - len(ciphertext) % 16).reshape(-1, 16)
+        step = AES.BULK_BATCH_BLOCKS
+        plaintext = b''.join(self.decrypt_blocks(blocks[i:i + step]).tobytes() for i in range(0, len(blocks), step))
         return AES.pkcs7_unpad(plaintext)
 
+    @staticmethod
+    def counter_blocks(iv: bytes, first: int, count: int):
+        """
+        Build `count` CTR counter blocks starting at block index `first` as an (N,16) uint8
+        array, with the same 128-bit big-endian wrap-around as modes.CTRCipher.
+        """
+        AES._require_numpy()
+        counter = (int.from_bytes(iv, 'big') + first) & 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
+        high, low = np.uint64(counter >> 64), np.uint64(counter & 0xFFFFFFFFFFFFFFFF)
+        lows = low + np.arange(count, dtype=np.uint64)
+        highs = high + (lows < low).astype(np.uint64)
+        out = np.empty((count, 16), dtype=np.uint8)
+        out[:, :8] = highs.astype('>u8').view(np.uint8).reshape(count, 8)
+        out[:, 8:] = lows.astype('>u8').view(np.uint8).reshape(count, 8)
+        return out
+
+    def ctr_bulk(self, data: bytes, iv: bytes) -> bytes:
+        """
+        CTR encryption/decryption with the keystream built by encrypt_blocks().
+        Same output as encryptor("ctr", iv).update(data).
+        """
+        AES._require_numpy()
+        if len(iv) != 16:
+            raise ValueError("Initial counter block must be 16 bytes.")
+        source = np.frombuffer(data, dtype=np.uint8)
+        out = np.empty(len(source), dtype=np.uint8)
+        step = AES.BULK_BATCH_BLOCKS
+        for first in range(0, -(-len(source) // 16), step):
+            start = first * 16
+            chunk = source[start:start + step * 16]
+            keystream = self.encrypt_blocks(AES.counter_blocks(iv, first, -(-len(chunk) // 16)))
+            np.bitwise_xor(chunk, keystream.reshape(-1)[:len(chunk)], out=out[start:start + len(chunk)])
+        return out.tobytes()
+
+
+# Per-process state of the ctr_parallel() workers
+_ctr_worker_aes = None
+_ctr_worker_memory = None
+
+def _init_ctr_worker(key: bytes, engine: str, memory_name: str) -> None:
+    global _ctr_worker_aes, _ctr_worker_memory
+    _ctr_worker_aes = AES(key, engine)
+    _ctr_worker_memory = shared_memory.SharedMemory(name=memory_name)
+
+def _ctr_segment(task: Tuple[bytes, int, int]) -> None:
+    counter_block, start, length = task
+    buffer = _ctr_worker_memory.buf
+    buffer[start:start + length] = _ctr_worker_aes.encryptor("ctr", counter_block).update(buffer[start:start + length])
+
+
+AES.TE0, AES.TE1, AES.TE2, AES.TE3 = AES.build_t_tables()
+AES.GF_EXP, AES.GF_LOG, AES.GF_MUL = AES.build_gf_tables()
+AES.TD0, AES.TD1, AES.TD2, AES.TD3 = AES.build_inv_t_tables()
+if np is not None:
+    AES._np_tables = {
+        "te": [np.array(t, dtype=np.uint32) for t in (AES.TE0, AES.TE1, AES.TE2, AES.TE3)],
+        "td": [np.array(t, dtype=np.uint32) for t in (AES.TD0, AES.TD1, AES.TD2, AES.TD3)],
+        "sbox": np.array(AES.S_BOX, dtype=np.uint32),
+        "inv_sbox": np.array(AES.INV_S_BOX, dtype=np.uint32),
+    }
+
 def main(): # SINGLE TEST FOR CORRECT FUNCTIONALITY
     """
     Demonstration of an end-to-end AES encryption/decryption pipeline using the AES class.
@@ -1,4 +1,6 @@
-from typing import List, Tuple
+from typing import List, Tuple, Optional
+import modes
+from key_cache import SCHEDULE_CACHE
 
 class DES:
     # -----------------------------------------------------------------------------
@@ -145,18 +147,47 @@ class DES:
 
     num_round = 16
 
-    def __init__(self, key: bytes, method: str = "xor_based"):
+    #: Feistel function types selectable on DES(key, method)
+    METHODS = ("standard", "xor_based", "and_based")
+
+    #: Block engines selectable on DES(key, method, engine)
+    ENGINES = ("integer", "reference")
+
+    def __init__(self, key: bytes, method: str = "xor_based", engine: str = "integer", cache: bool = True):
         """
         Initialize DES instance with the given 8-byte key.
         :param key: 8-byte key (64 bits) - note that only 56 bits are effectively used.
         :param method: Feistel function type ("standard", "xor_based", "and_based".).
+        :param engine: Block engine ("integer" or "reference"). Both produce identical output.
+        :param cache: Share the key schedules through key_cache.SCHEDULE_CACHE (False for one-time keys).
         """
+        if method not in DES.METHODS:
+            raise ValueError("Invalid method! Choose 'standard',  'xor_based' or 'and_based'.")
+        if engine not in DES.ENGINES:
+            raise ValueError(f"Invalid engine! Choose one of {DES.ENGINES}.")
         self.key = key
         self.method = method
-        key_int = int.from_bytes(key, 'big')
-        key_bits = DES._int_to_bits(key_int, 64)
-        self.subkeys = DES.generate_subkeys(key_bits)
+        self.engine = engine
+        self.cache = cache
+        self._subkeys = None  # bit-list schedule, only built by the paths that use it
+        if engine == "integer":
+            round_keys = DES.round_keys_int(SCHEDULE_CACHE.get("des-int", key, DES.build_subkeys_int, cache), method)
+            inverse_round_keys = round_keys[::-1]
+            self._encrypt_block = lambda block: DES.crypt_block_int(block, round_keys, method)
+            self._decrypt_block = lambda block: DES.crypt_block_int(block, inverse_round_keys, method)
+        else:
+            self._encrypt_block = self.encrypt_block_bits
+            self._decrypt_block = self.decrypt_block_bits
 
+    @property
+    def subkeys(self) -> Tuple[Tuple[int, ...], ...]:
+        """
+        The 16 subkeys as bit tuples, used by the reference engine and the bitsliced paths.
+        Built on first access, so the integer engine never pays for the bit-list schedule.
+        """
+        if self._subkeys is None:
+            self._subkeys = SCHEDULE_CACHE.get("des", self.key, DES.build_subkeys, self.cache)
+        return self._subkeys
 
     # -----------------------------------------------------------------------------
     #                           HELPER FUNCTIONS
@@ -216,7 +247,40 @@ class DES:
         for i in range(len(a)):
             ret.append(a[i] & b[i])
         return ret
-    
+
+    @staticmethod
+    def _permute_int(value: int, table: List[int], width: int) -> int:
+        """
+        Permute the bits of a width-bit integer (bit 1 is the most significant) according to a table.
+        """
+        out = 0
+        for position in table:
+            out = (out << 1) | ((value >> (width - position)) & 1)
+        return out
+
+    @staticmethod
+    def build_permutation_lut(table: List[int], width: int) -> List[List[int]]:
+        """
+        Byte-indexed lookup tables for a fixed permutation of a width-bit integer.
+        lut[i][b] holds the output bits contributed by byte i (from the left) having value b,
+        so a permutation is width // 8 lookups ORed together.
+        """
+        lut = []
+        for i in range(width // 8):
+            shift = width - 8 * (i + 1)
+            lut.append([DES._permute_int(b << shift, table, width) for b in range(256)])
+        return lut
+
+    @staticmethod
+    def _permute_lut(value: int, lut: List[List[int]]) -> int:
+        """
+        Permute an integer with tables from build_permutation_lut.
+        """
+        out = 0
+        for row, b in zip(lut, value.to_bytes(len(lut), 'big')):
+            out |= row[b]
+        return out
+
     @staticmethod
     def pkcs7_pad(data: bytes, block_size: int = 8) -> bytes:
         """
@@ -260,6 +324,39 @@ class DES:
             subkeys.append(subkey)
         return subkeys
 
+    @staticmethod
+    def build_subkeys(key: bytes) -> Tuple[Tuple[int, ...], ...]:
+        """
+        Subkeys for an 8-byte key as read-only tuples (the form kept in key_cache.SCHEDULE_CACHE).
+        """
+        key_bits = DES._int_to_bits(int.from_bytes(key, 'big'), 64)
+        return tuple(tuple(subkey) for subkey in DES.generate_subkeys(key_bits))
+
+    @staticmethod
+    def build_subkeys_int(key: bytes) -> Tuple[int, ...]:
+        """
+        The 16 subkeys for an 8-byte key as 48-bit integers, computed on integers:
+        PC1/PC2 through byte lookup tables and the C/D rotations as 28-bit shifts.
+        """
+        cd = DES._permute_lut(int.from_bytes(key, 'big'), DES.PC1_LUT)
+        c, d = cd >> 28, cd & 0xFFFFFFF
+        subkeys = []
+        for shift in DES.SHIFT_TABLE:
+            c = ((c << shift) | (c >> (28 - shift))) & 0xFFFFFFF
+            d = ((d << shift) | (d >> (28 - shift))) & 0xFFFFFFF
+            subkeys.append(DES._permute_lut((c << 28) | d, DES.PC2_LUT))
+        return tuple(subkeys)
+
+    @staticmethod
+    def round_keys_int(subkeys: Tuple[int, ...], method: str) -> tuple:
+        """
+        Round keys in the form crypt_block_int consumes: eight 6-bit S-box chunks per round
+        for "standard", the leading 32 subkey bits for "xor_based" and "and_based".
+        """
+        if method == "standard":
+            return tuple(tuple((subkey >> (42 - 6 * i)) & 0x3F for i in range(8)) for subkey in subkeys)
+        return tuple(subkey >> 16 for subkey in subkeys)
+
     # -----------------------------------------------------------------------------
     #                           FEISTEL FUNCTION
     # -----------------------------------------------------------------------------
@@ -308,6 +405,322 @@ class DES:
         else:
             raise ValueError("Invalid method! Choose 'standard',  'xor_based' or 'and_based'.")
 
+    # -----------------------------------------------------------------------------
+    #                   INTEGER ENGINE (COMBINED SP TABLES)
+    # -----------------------------------------------------------------------------
+
+    @staticmethod
+    def build_sp_tables() -> List[List[int]]:
+        """
+        SP[i][x] is the 32-bit Feistel output of S-box i for the 6-bit input x (in E-expansion
+        bit order), already permuted by P_TABLE. The standard round function is then
+        eight lookups ORed together.
+        """
+        tables = []
+        for i, sbox in enumerate(DES.S_BOXES):
+            table = []
+            for x in range(64):
+                row = ((x >> 4) & 2) | (x & 1)
+                column = (x >> 1) & 0xF
+                table.append(DES._permute_int(sbox[row][column] << (28 - 4 * i), DES.P_TABLE, 32))
+            tables.append(table)
+        return tables
+
+    @staticmethod
+    def initial_permutation_int(block: bytes) -> Tuple[int, int]:
+        """
+        IP of an 8-byte block, returned as the 32-bit halves (L0, R0).
+        """
+        ip0, ip1, ip2, ip3, ip4, ip5, ip6, ip7 = DES.IP_LUT
+        b0, b1, b2, b3, b4, b5, b6, b7 = block
+        value = ip0[b0] | ip1[b1] | ip2[b2] | ip3[b3] | ip4[b4] | ip5[b5] | ip6[b6] | ip7[b7]
+        return value >> 32, value & 0xFFFFFFFF
+
+    @staticmethod
+    def final_permutation_int(left: int, right: int) -> bytes:
+        """
+        FP of the swapped halves R16 || L16 as an 8-byte block.
+        """
+        fp0, fp1, fp2, fp3, fp4, fp5, fp6, fp7 = DES.FP_LUT
+        b0, b1, b2, b3, b4, b5, b6, b7 = ((right << 32) | left).to_bytes(8, 'big')
+        value = fp0[b0] | fp1[b1] | fp2[b2] | fp3[b3] | fp4[b4] | fp5[b5] | fp6[b6] | fp7[b7]
+        return value.to_bytes(8, 'big')
+
+    @staticmethod
+    def rounds_int(left: int, right: int, round_keys: tuple, method: str) -> Tuple[int, int]:
+        """
+        Run the 16 Feistel rounds on integer halves.
+
+        :param round_keys: Output of round_keys_int for the same method (reversed for decryption).
+        :return: (L16, R16)
+        """
+        if method == "standard":
+            sp0, sp1, sp2, sp3, sp4, sp5, sp6, sp7 = DES.SP
+            for k0, k1, k2, k3, k4, k5, k6, k7 in round_keys:
+                # R rotated right by one: the 6-bit E-expansion chunk i sits at bit 26 - 4i
+                r = ((right >> 1) | (right << 31)) & 0xFFFFFFFF
+                left, right = right, left ^ (
+                    sp0[(r >> 26) ^ k0] | sp1[((r >> 22) & 0x3F) ^ k1]
+                    | sp2[((r >> 18) & 0x3F) ^ k2] | sp3[((r >> 14) & 0x3F) ^ k3]
+                    | sp4[((r >> 10) & 0x3F) ^ k4] | sp5[((r >> 6) & 0x3F) ^ k5]
+                    | sp6[((r >> 2) & 0x3F) ^ k6] | sp7[(((right << 1) | (right >> 31)) & 0x3F) ^ k7])
+        else:
+            xor_based = method == "xor_based"
+            e0, e1, e2, e3 = DES.E_LUT
+            for k in round_keys:
+                # only the leading 32 of the 48 expansion bits are used
+                expanded = (e0[right >> 24] | e1[(right >> 16) & 0xFF]
+                            | e2[(right >> 8) & 0xFF] | e3[right & 0xFF]) >> 16
+                left, right = right, left ^ (expanded ^ k if xor_based else expanded & k)
+        return left, right
+
+    @staticmethod
+    def crypt_block_int(block: bytes, round_keys: tuple, method: str) -> bytes:
+        """
+        Encrypt one 8-byte block with halves and subkeys held as integers.
+        Decryption is the same with the round keys reversed.
+
+        :param round_keys: Output of round_keys_int for the same method.
+        """
+        left, right = DES.initial_permutation_int(block)
+        left, right = DES.rounds_int(left, right, round_keys, method)
+        return DES.final_permutation_int(left, right)
+
+    # -----------------------------------------------------------------------------
+    #                   BITSLICED ENGINE (BATCHES OF BLOCKS OR KEYS)
+    # -----------------------------------------------------------------------------
+
+    #: Blocks (or keys) transposed together by the bitsliced engine
+    BITSLICE_BATCH = 4096
+
+    @staticmethod
+    def build_bs_sbox_terms() -> tuple:
+        """
+        Gate networks for the eight S-boxes as data, evaluated by _bs_sbox.
+        With x0 = first E-expansion bit, the row is x0 x5 and the column x1..x4; each output
+        bit is the OR over the column minterms c of (minterm c AND row function t), where t
+        is the 4-bit truth table over the rows (bit 3 - row) read off the table.
+        They are derived from the repo's S_BOXES, so they always agree with them.
+
+        :return: terms[sbox][bit] = ((c, t), ...) with t != 0
+        """
+        terms = []
+        for sbox in DES.S_BOXES:
+            bits = []
+            for bit in range(4):
+                pairs = []
+                for c in range(16):
+                    t = sum(1 << (3 - row) for row in range(4) if (sbox[row][c] >> (3 - bit)) & 1)
+                    if t:
+                        pairs.append((c, t))
+                bits.append(tuple(pairs))
+            terms.append(tuple(bits))
+        return tuple(terms)
+
+    @staticmethod
+    def _bs_sbox(terms: tuple, x0: int, x1: int, x2: int, x3: int, x4: int, x5: int, ones: int) -> List[int]:
+        """
+        Evaluate one S-box on 6 bit-planes from its BS_SBOX_TERMS entry.
+
+        :return: The 4 output planes, most significant bit first.
+        """
+        n0, n1, n2, n3, n4, n5 = x0 ^ ones, x1 ^ ones, x2 ^ ones, x3 ^ ones, x4 ^ ones, x5 ^ ones
+        high = (n1 & n2, n1 & x2, x1 & n2, x1 & x2)
+        low = (n3 & n4, n3 & x4, x3 & n4, x3 & x4)
+        columns = [h & l for h in high for l in low]
+        # rows[t] is the OR of the row minterms selected by truth table t (bit 3 - row)
+        minterms = (n0 & n5, n0 & x5, x0 & n5, x0 & x5)
+        rows = [0] * 16
+        for t in range(1, 16):
+            lowest = t & -t
+            rows[t] = rows[t ^ lowest] | minterms[4 - lowest.bit_length()]
+        outputs = []
+        for bit_terms in terms:
+            y = 0
+            for c, t in bit_terms:
+                y |= columns[c] & rows[t]
+            outputs.append(y)
+        return outputs
+
+    @staticmethod
+    def _bs_pack(data: bytes, count: int):
+        """
+        Transpose `count` 8-byte blocks into 64 bit-planes (plane 0 = most significant bit).
+        Blocks are split into 8 equal lanes of n blocks; block i of lane g is bit 8*i + g
+        of every plane, which lets each byte column be moved with one int.from_bytes().
+
+        :return: (planes, n)
+        """
+        n = -(-count // 8)
+        data = bytes(data) + bytes(8 * (8 * n - count))
+        lane = 8 * n
+        spread = int.from_bytes(b'\x01' * n, 'little')
+        planes = []
+        for p in range(8):
+            columns = [int.from_bytes(data[g * lane + p:(g + 1) * lane:8], 'little') for g in range(8)]
+            for k in range(8):
+                bit = 7 - k
+                plane = 0
+                for g, column in enumerate(columns):
+                    plane |= ((column >> bit) & spread) << g
+                planes.append(plane)
+        return planes, n
+
+    @staticmethod
+    def _bs_unpack(planes, n: int, count: int) -> bytes:
+        """
+        Inverse of _bs_pack().
+        """
+        lane = 8 * n
+        spread = int.from_bytes(b'\x01' * n, 'little')
+        out = bytearray(8 * lane)
+        for p in range(8):
+            byte_planes = planes[8 * p:8 * p + 8]
+            for g in range(8):
+                column = 0
+                for k, plane in enumerate(byte_planes):
+                    column |= ((plane >> g) & spread) << (7 - k)
+                out[g * lane + p:(g + 1) * lane:8] = column.to_bytes(n, 'little')
+        return bytes(out[:8 * count])
+
+    @staticmethod
+    def _bs_key_planes(subkeys, ones: int) -> list:
+        """
+        Round-key planes for one fixed key: a subkey bit is the all-ones or the zero plane.
+        """
+        return [[ones if bit else 0 for bit in subkey] for subkey in subkeys]
+
+    @staticmethod
+    def _bs_rounds(planes: list, round_key_planes: list, method: str, ones: int) -> list:
+        """
+        IP, 16 Feistel rounds and FP on 64 bit-planes. The permutations and the E-expansion
+        only reorder planes; the S-boxes are the gate networks in BS_SBOX_TERMS.
+        """
+        planes = [planes[i - 1] for i in DES.IP_TABLE]
+        left, right = planes[:32], planes[32:]
+        sbox_terms, sbox = DES.BS_SBOX_TERMS, DES._bs_sbox
+        e_table, p_table = DES.E_TABLE, DES.P_TABLE
+        for key in round_key_planes:
+            expanded = [right[i - 1] for i in e_table]
+            if method == "standard":
+                mixed = [e ^ k for e, k in zip(expanded, key)]
+                substituted = []
+                for i, terms in enumerate(sbox_terms):
+                    substituted.extend(sbox(terms, *mixed[6 * i:6 * i + 6], ones))
+                f = [substituted[i - 1] for i in p_table]
+            elif method == "xor_based":
+                f = [e ^ k for e, k in zip(expanded[:32], key)]
+            else:
+                f = [e & k for e, k in zip(expanded[:32], key)]
+            left, right = right, [l ^ x for l, x in zip(left, f)]
+        combined = right + left
+        return [combined[i - 1] for i in DES.FP_TABLE]
+
+    @staticmethod
+    def crypt_blocks_bitsliced(data: bytes, subkeys, method: str) -> bytes:
+        """
+        Encrypt whole 8-byte blocks under one key, BITSLICE_BATCH blocks at a time.
+        Decryption is the same with the subkeys reversed.
+
+        :param subkeys: The 16 subkeys as bit sequences (DES.build_subkeys).
+        """
+        step = 8 * DES.BITSLICE_BATCH
+        out = []
+        for start in range(0, len(data), step):
+            chunk = data[start:start + step]
+            count = len(chunk) // 8
+            planes, n = DES._bs_pack(chunk, count)
+            ones = (1 << (8 * n)) - 1
+            planes = DES._bs_rounds(planes, DES._bs_key_planes(subkeys, ones), method, ones)
+            out.append(DES._bs_unpack(planes, n, count))
+        return b''.join(out)
+
+    @staticmethod
+    def _bs_batch_key_planes(keys: bytes, count: int, decrypt: bool = False):
+        """
+        Round-key planes for `count` different 8-byte keys. Key schedule bits are only a
+        selection of key bits (BS_KEY_BITS), so every subkey plane is one of the 64 key planes.
+
+        :param decrypt: Return the rounds in reverse order.
+        :return: (round key planes, n)
+        """
+        key_planes, n = DES._bs_pack(keys, count)
+        schedule = DES.BS_KEY_BITS[::-1] if decrypt else DES.BS_KEY_BITS
+        return [[key_planes[i] for i in subkey] for subkey in schedule], n
+
+    @staticmethod
+    def crypt_keys_bitsliced(block: bytes, keys, method: str = "standard", decrypt: bool = False) -> bytes:
+        """
+        Encrypt (or decrypt) one 8-byte block under many keys, BITSLICE_BATCH keys at a time.
+
+        :param keys: Iterable of 8-byte keys (or their concatenation).
+        :return: The output blocks for every key, in order, concatenated.
+        """
+        keys = b''.join(keys) if not isinstance(keys, (bytes, bytearray)) else keys
+        value = int.from_bytes(block, 'big')
+        out = []
+        for start in range(0, len(keys), 8 * DES.BITSLICE_BATCH):
+            chunk = keys[start:start + 8 * DES.BITSLICE_BATCH]
+            count = len(chunk) // 8
+            round_keys, n = DES._bs_batch_key_planes(chunk, count, decrypt)
+            ones = (1 << (8 * n)) - 1
+            planes = [ones if (value >> (63 - i)) & 1 else 0 for i in range(64)]
+            out.append(DES._bs_unpack(DES._bs_rounds(planes, round_keys, method, ones), n, count))
+        return b''.join(out)
+
+    @staticmethod
+    def encrypt_keys_bitsliced(plaintext: bytes, keys, method: str = "standard") -> List[bytes]:
+        """
+        Encrypt one 8-byte block under many keys.
+
+        :return: The ciphertext for every key, in order.
+        """
+        out = DES.crypt_keys_bitsliced(plaintext, keys, method)
+        return [out[i:i + 8] for i in range(0, len(out), 8)]
+
+    @staticmethod
+    def decrypt_keys_bitsliced(ciphertext: bytes, keys, method: str = "standard") -> List[bytes]:
+        """
+        Decrypt one 8-byte block under many keys.
+
+        :return: The plaintext for every key, in order.
+        """
+        out = DES.crypt_keys_bitsliced(ciphertext, keys, method, decrypt=True)
+        return [out[i:i + 8] for i in range(0, len(out), 8)]
+
+    @staticmethod
+    def search_keys_bitsliced(plaintext: bytes, ciphertext: bytes, keys,
+                              method: str = "standard") -> List[bytes]:
+        """
+        Known-plaintext key search: return every key in `keys` that encrypts plaintext to
+        ciphertext. Matches are found on the planes directly (an AND of 64 XNORs), so the
+        ciphertexts are never transposed back.
+
+        :param keys: Iterable of 8-byte keys (or their concatenation).
+        """
+        keys = b''.join(keys) if not isinstance(keys, (bytes, bytearray)) else keys
+        block = int.from_bytes(plaintext, 'big')
+        target = int.from_bytes(ciphertext, 'big')
+        found = []
+        for start in range(0, len(keys), 8 * DES.BITSLICE_BATCH):
+            chunk = keys[start:start + 8 * DES.BITSLICE_BATCH]
+            count = len(chunk) // 8
+            round_keys, n = DES._bs_batch_key_planes(chunk, count)
+            ones = (1 << (8 * n)) - 1
+            planes = [ones if (block >> (63 - i)) & 1 else 0 for i in range(64)]
+            match = ones
+            for i, plane in enumerate(DES._bs_rounds(planes, round_keys, method, ones)):
+                match &= plane if (target >> (63 - i)) & 1 else plane ^ ones
+                if not match:
+                    break
+            while match:
+                bit = (match & -match).bit_length() - 1
+                match &= match - 1
+                index = (bit & 7) * n + (bit >> 3)  # lane g = bit % 8 holds blocks g*n ...
+                if index < count:
+                    found.append(bytes(chunk[8 * index:8 * index + 8]))
+        return found
+
     # -----------------------------------------------------------------------------
     #                       DES ENCRYPTION/DECRYPTION ROUND
     # -----------------------------------------------------------------------------
@@ -320,6 +733,18 @@ class DES:
         """
         Encrypt a single 8-byte block using DES.
         """
+        return self._encrypt_block(block)
+
+    def decrypt_block(self, block: bytes) -> bytes:
+        """
+        Decrypt a single 8-byte block using DES.
+        """
+        return self._decrypt_block(block)
+
+    def encrypt_block_bits(self, block: bytes) -> bytes:
+        """
+        Encrypt a single 8-byte block with the reference (list of bits) engine.
+        """
         block_int = int.from_bytes(block, 'big')
         block_bits = DES._int_to_bits(block_int, 64)
 
@@ -336,9 +761,9 @@ class DES:
         ciphertext_int = DES._bits_to_int(ciphertext_bits)
         return ciphertext_int.to_bytes(8,'big')
 
-    def decrypt_block(self, block: bytes) -> bytes:
+    def decrypt_block_bits(self, block: bytes) -> bytes:
         """
-        Decrypt a single 8-byte block using DES.
+        Decrypt a single 8-byte block with the reference (list of bits) engine.
         """
 
         block_int = int.from_bytes(block, 'big')
@@ -358,6 +783,46 @@ class DES:
         ciphertext_int = DES._bits_to_int(ciphertext_bits)
         return ciphertext_int.to_bytes(8,'big')
 
+    def encrypt_into(self, plaintext, out) -> int:
+        """
+        Encrypt a plaintext (PKCS7 padded) into a writable buffer.
+        Blocks are read through a memoryview and written straight into `out`.
+
+        :param out: Writable buffer of at least len(plaintext) // 8 * 8 + 8 bytes.
+        :return: Number of bytes written.
+        """
+        src = memoryview(plaintext).cast('B')
+        dst = memoryview(out).cast('B')
+        full = len(src) - len(src) % 8
+        total = full + 8
+        if len(dst) < total:
+            raise ValueError(f"Output buffer must hold at least {total} bytes.")
+        encrypt_block = self._encrypt_block
+        for start in range(0, full, 8):
+            dst[start:start + 8] = encrypt_block(src[start:start + 8])
+        padding_length = total - len(src)
+        dst[full:total] = encrypt_block(bytes(src[full:]) + bytes([padding_length] * padding_length))
+        return total
+
+    def decrypt_into(self, ciphertext, out) -> int:
+        """
+        Decrypt a ciphertext into a writable buffer.
+
+        :param out: Writable buffer of at least len(ciphertext) // 8 * 8 bytes.
+        :return: Length of the plaintext in `out` after removing the PKCS7 padding.
+        """
+        src = memoryview(ciphertext).cast('B')
+        dst = memoryview(out).cast('B')
+        full = len(src) - len(src) % 8
+        if len(dst) < full:
+            raise ValueError(f"Output buffer must hold at least {full} bytes.")
+        decrypt_block = self._decrypt_block
+        for start in range(0, full, 8):
+            dst[start:start + 8] = decrypt_block(src[start:start + 8])
+        if not full:
+            return 0
+        return full - dst[full - 1]
+
     def encrypt(self, plaintext: bytes) -> bytes:
         """
         Encrypt a plaintext (bytes) using DES with the given 8-byte key.
@@ -365,17 +830,9 @@ class DES:
 
         :return: Encrypted data in bytes.
         """
-        block_size = 8
-        padded_plaintext = DES.pkcs7_pad(plaintext, block_size)
-        num_blocks = len(padded_plaintext) // block_size
-        results = []
-        for i in range(num_blocks):
-            start = i* block_size
-            block = padded_plaintext[start: start+block_size]
-            encrypted_block = self.encrypt_block(block)
-            results.append(encrypted_block)
-
-        return b''.join(results)
+        out = bytearray(len(plaintext) // 8 * 8 + 8)
+        self.encrypt_into(plaintext, out)
+        return bytes(out)
 
     def decrypt(self, ciphertext: bytes) -> bytes:
         """
@@ -384,16 +841,168 @@ class DES:
 
         :return: Decrypted data in bytes (with padding removed).
         """
-        block_size = 8
-        num_blocks = len(ciphertext) // block_size
-        results = []
-        for i in range(num_blocks):
-            start = i * block_size
-            block = ciphertext[start:start + block_size]
-            results.append(self.decrypt_block(block))
-        plaintext = b''.join(results)
-            
-        return DES.pkcs7_unpad(plaintext)
+        out = bytearray(len(ciphertext) // 8 * 8)
+        length = self.decrypt_into(ciphertext, out)
+        del out[length:]
+        return bytes(out)
+
+    def encrypt_blocks(self, data: bytes) -> bytes:
+        """
+        Encrypt whole 8-byte blocks (no padding) with the bitsliced engine.
+        Bulk ECB; also produces CTR keystream from a run of counter blocks.
+        """
+        if len(data) % 8:
+            raise ValueError("Data length must be a multiple of 8 bytes.")
+        return DES.crypt_blocks_bitsliced(data, self.subkeys, self.method)
+
+    def decrypt_blocks(self, data: bytes) -> bytes:
+        """
+        Decrypt whole 8-byte blocks (no padding) with the bitsliced engine.
+        """
+        if len(data) % 8:
+            raise ValueError("Data length must be a multiple of 8 bytes.")
+        return DES.crypt_blocks_bitsliced(data, self.subkeys[::-1], self.method)
+
+    def ctr_bulk(self, data: bytes, iv: bytes) -> bytes:
+        """
+        CTR encryption/decryption of a whole message with the bitsliced engine.
+        Same counter convention as modes.CTRCipher (64-bit big-endian increment).
+        """
+        if len(iv) != 8:
+            raise ValueError("Initial counter block must be 8 bytes.")
+        num_blocks = -(-len(data) // 8)
+        first = int.from_bytes(iv, 'big')
+        mask = (1 << 64) - 1
+        counters = b''.join(((first + i) & mask).to_bytes(8, 'big') for i in range(num_blocks))
+        keystream = self.encrypt_blocks(counters)[:len(data)]
+        return (int.from_bytes(data, 'big') ^ int.from_bytes(keystream, 'big')).to_bytes(len(data), 'big')
+
+    # -----------------------------------------------------------------------------
+    #                   STREAMING MODES (ECB / CBC / CTR)
+    # -----------------------------------------------------------------------------
+
+    def encryptor(self, mode: str, iv: Optional[bytes] = None) -> modes.BlockModeStream:
+        """
+        Streaming encryptor with update()/finalize() (see modes.encryptor).
+        :param mode: "ecb", "cbc" or "ctr".
+        :param iv: 8-byte IV (CBC) or initial counter block (CTR).
+        """
+        return modes.encryptor(mode, self._encrypt_block, self._decrypt_block, 8, iv)
+
+    def decryptor(self, mode: str, iv: Optional[bytes] = None) -> modes.BlockModeStream:
+        """
+        Streaming decryptor with update()/finalize() (see modes.decryptor).
+        """
+        return modes.decryptor(mode, self._encrypt_block, self._decrypt_block, 8, iv)
+
+
+class TripleDES:
+    """
+    Triple DES in EDE form: C = E_K3(D_K2(E_K1(P))), built on the integer DES engine.
+    The FP at the end of one pass and the IP at the start of the next cancel out, so
+    IP and FP are applied only once per block and the halves go straight from one
+    16-round pass into the next.
+
+    Not wire-compatible with standard (FIPS 46-3 / SP 800-67) 3DES: it inherits this
+    module's S_BOXES, whose S8 row 3 differs from the FIPS table, so it cannot exchange
+    ciphertexts with other implementations (keying option 3 with key 133457799BBCDFF1
+    encrypts 0123456789ABCDEF to f2ddb7fc3344a416, not the FIPS 85e813540f0ab405).
+    """
+
+    def __init__(self, key: bytes, method: str = "standard", cache: bool = True):
+        """
+        :param key: 24 bytes K1 || K2 || K3 (keying option 1), 16 bytes K1 || K2 with
+                    K3 = K1 (option 2) or 8 bytes K1 = K2 = K3 (option 3, same as single DES).
+        :param method: Feistel function type of the underlying DES (see DES.METHODS).
+        :param cache: Share the round keys through key_cache.SCHEDULE_CACHE (see DES).
+        """
+        if len(key) not in (8, 16, 24):
+            raise ValueError("Triple DES key must be 8, 16 or 24 bytes.")
+        if method not in DES.METHODS:
+            raise ValueError("Invalid method! Choose 'standard',  'xor_based' or 'and_based'.")
+        self.key = key
+        self.method = method
+        self.keying_option = {24: 1, 16: 2, 8: 3}[len(key)]
+        k1, k2 = key[:8], key[8:16] or key[:8]
+        k3 = key[16:24] or k1
+        k1_keys, k2_keys, k3_keys = (
+            DES.round_keys_int(SCHEDULE_CACHE.get("des-int", k, DES.build_subkeys_int, cache), method)
+            for k in (k1, k2, k3))
+        # decrypting with K2 runs its round keys in reverse
+        self._encrypt_keys = (k1_keys, k2_keys[::-1], k3_keys)
+        self._decrypt_keys = (k3_keys[::-1], k2_keys, k1_keys[::-1])
+
+    @staticmethod
+    def crypt_block_ede(block: bytes, stage_keys: tuple, method: str) -> bytes:
+        """
+        Three chained DES passes on one 8-byte block with a single IP and FP.
+
+        :param stage_keys: Round keys of the three passes, already ordered for the direction.
+        """
+        first, second, third = stage_keys
+        left, right = DES.initial_permutation_int(block)
+        left, right = DES.rounds_int(left, right, first, method)
+        # FP followed by IP is the identity: the next pass starts from (R16, L16)
+        left, right = DES.rounds_int(right, left, second, method)
+        left, right = DES.rounds_int(right, left, third, method)
+        return DES.final_permutation_int(left, right)
+
+    def encrypt_block(self, block: bytes) -> bytes:
+        """
+        Encrypt a single 8-byte block (E_K3(D_K2(E_K1(block)))).
+        """
+        return TripleDES.crypt_block_ede(block, self._encrypt_keys, self.method)
+
+    def decrypt_block(self, block: bytes) -> bytes:
+        """
+        Decrypt a single 8-byte block (D_K1(E_K2(D_K3(block)))).
+        """
+        return TripleDES.crypt_block_ede(block, self._decrypt_keys, self.method)
+
+    def encryptor(self, mode: str, iv: Optional[bytes] = None) -> modes.BlockModeStream:
+        """
+        Streaming encryptor with update()/finalize() (see modes.encryptor).
+        :param mode: "ecb", "cbc" or "ctr".
+        :param iv: 8-byte IV (CBC) or initial counter block (CTR).
+        """
+        return modes.encryptor(mode, self.encrypt_block, self.decrypt_block, 8, iv)
+
+    def decryptor(self, mode: str, iv: Optional[bytes] = None) -> modes.BlockModeStream:
+        """
+        Streaming decryptor with update()/finalize() (see modes.decryptor).
+        """
+        return modes.decryptor(mode, self.encrypt_block, self.decrypt_block, 8, iv)
+
+    def encrypt(self, plaintext: bytes, mode: str = "ecb", iv: Optional[bytes] = None) -> bytes:
+        """
+        Encrypt a whole message (PKCS7 padded for ECB/CBC).
+
+        :return: Encrypted data in bytes.
+        """
+        stream = self.encryptor(mode, iv)
+        return stream.update(plaintext) + stream.finalize()
+
+    def decrypt(self, ciphertext: bytes, mode: str = "ecb", iv: Optional[bytes] = None) -> bytes:
+        """
+        Decrypt a whole message (padding removed for ECB/CBC).
+
+        :return: Decrypted data in bytes.
+        """
+        stream = self.decryptor(mode, iv)
+        return stream.update(ciphertext) + stream.finalize()
+
+
+DES.SP = DES.build_sp_tables()
+DES.IP_LUT = DES.build_permutation_lut(DES.IP_TABLE, 64)
+DES.FP_LUT = DES.build_permutation_lut(DES.FP_TABLE, 64)
+DES.PC1_LUT = DES.build_permutation_lut(DES.PC1, 64)
+DES.PC2_LUT = DES.build_permutation_lut(DES.PC2, 56)
+DES.E_LUT = DES.build_permutation_lut(DES.E_TABLE, 32)
+#: BS_SBOX_TERMS[s][bit] lists the (column minterm, row function) pairs ORed into that output bit
+DES.BS_SBOX_TERMS = DES.build_bs_sbox_terms()
+#: BS_KEY_BITS[r][i] is the key bit (0 = most significant) that becomes bit i of subkey r
+DES.BS_KEY_BITS = DES.generate_subkeys(list(range(64)))
+
 
 def main():  # SINGLE TEST FOR CORRECT FUNCTIONALITY
     """
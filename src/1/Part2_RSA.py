@@ -1,34 +1,39 @@
 import sympy  # use this or other modules for generating required prime numbers
-from typing import Tuple
-import random
-from math import ceil
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from keystore import KEY_STORE, rsa_parameters
+from math import ceil, gcd
 class RSA:
     """
     Supports encryption and decryption with *chunking*.
     """
 
-    def __init__(self, bit_size: int = 1024,p=None, q=None, e: int = 65537, seed=42):
+    def __init__(self, bit_size: int = 1024,p=None, q=None, e: int = 65537, seed=None):
         """
         Initialize RSA with a specified bit_size for p and q.
 
         :param bit_size: Bit length for each prime p and q.
+        :param seed: None (default) draws a fresh random key that is never stored; an explicit
+            seed gives a reproducible, publicly derivable key (tests and benchmarks only).
         """
-        random.seed(seed)
         if p is None or q is None:
-            while True:
-                p = sympy.randprime(2**(bit_size - 1), 2**bit_size)
-                q = sympy.randprime(2**(bit_size - 1), 2**bit_size)
-                if p != q:
-                    break
-        
-        self.p = p
-        self.q = q
-        self.n = p * q
-        self.phi = (p - 1) * (q - 1)
-        if sympy.gcd(e,self.n)!=1:
-            raise ValueError("e must be coprime with totient(n)")
+            # seeded keys are generated once per (bit_size, seed, e), afterwards loaded from the key store
+            key = KEY_STORE.rsa(bit_size, seed, e)
+        else:
+            if sympy.gcd(e,p * q)!=1:
+                raise ValueError("e must be coprime with totient(n)")
+            key = rsa_parameters(p, q, e)
+
+        self.p = key["p"]
+        self.q = key["q"]
+        self.n = key["n"]
+        self.phi = (self.p - 1) * (self.q - 1)
         self.e = e
-        self.d = pow(e,-1,self.phi)
+        self.d = key["d"]
+        # CRT parameters for decryption
+        self.dp = key["dp"]
+        self.dq = key["dq"]
+        self.qinv = key["qinv"]
 
     def get_public_key(self) -> Tuple[int, int]:
         """
@@ -42,49 +47,224 @@ class RSA:
         """
         return(self.n,self.d)
 
-    def encrypt_chunk(self, chunk: bytes,chunk_size:int) -> bytes:
+    def encrypt_chunk(self, chunk: bytes,chunk_size:int, e: int = None) -> bytes:
         """
         Encrypts a single chunk of bytes (must be < n).
+
+        :param e: Public exponent to use instead of self.e (e.g. one of batch_exponents()).
         """
         m = int.from_bytes(chunk, byteorder='big')
-        c = pow(m, self.e ,self.n)
+        c = pow(m, self.e if e is None else e ,self.n)
         return c.to_bytes(chunk_size, byteorder='big')
 
-    def decrypt_chunk(self, chunk: bytes,chunk_size:int) -> bytes:
+    def decrypt_chunk(self, chunk: bytes,chunk_size:int, e: int = None) -> bytes:
         """
-        Decrypts a single chunk of bytes.
+        Decrypts a single chunk of bytes with the CRT: two half-size exponentiations
+        mod p and q, recombined with Garner's formula.
+
+        :param e: Public exponent the chunk was encrypted with, if not self.e.
+        """
+        c = int.from_bytes(chunk, byteorder='big')
+        m = self.crt_power(c, e)
+        return m.to_bytes(chunk_size, byteorder='big')
+
+    def crt_power(self, c: int, e: int = None) -> int:
+        """
+        c^d mod n computed as m2 + q * (qinv * (m1 - m2) mod p).
+        With e given, d is the private exponent matching e instead of self.d.
+        """
+        dp, dq = (self.dp, self.dq) if e is None else (pow(e, -1, self.p - 1), pow(e, -1, self.q - 1))
+        m1 = pow(c % self.p, dp, self.p)
+        m2 = pow(c % self.q, dq, self.q)
+        return m2 + self.q * ((self.qinv * (m1 - m2)) % self.p)
+
+    def decrypt_chunk_no_crt(self, chunk: bytes,chunk_size:int) -> bytes:
+        """
+        Decrypts a single chunk of bytes with one full-size exponentiation (reference).
         """
         m = int.from_bytes(chunk, byteorder='big')
         c = pow(m, self.d ,self.n)
         return c.to_bytes(chunk_size, byteorder='big')
 
-    def encrypt(self, data: bytes) -> bytes:
+    def batch_exponents(self, count: int) -> List[int]:
         """
-        Encrypts data using chunking.
+        The `count` smallest odd primes that are valid public exponents for this modulus,
+        for use with decrypt_chunks_batch().
+        """
+        exponents, candidate = [], 3
+        while len(exponents) < count:
+            if sympy.isprime(candidate) and gcd(candidate, self.phi) == 1:
+                exponents.append(candidate)
+            candidate += 2
+        return exponents
+
+    @staticmethod
+    def _fiat_tree(values: List[int], exponents: List[int], prime: int) -> tuple:
+        """
+        Product tree of Fiat's batch RSA modulo one prime. A node is (v, e, left, right) where
+        e is the product of its leaves' exponents and v = v_left^e_right * v_right^e_left,
+        so the e-th root of v is the product of the leaves' plaintexts.
+        """
+        if len(values) == 1:
+            return (values[0], exponents[0], None, None)
+        half = len(values) // 2
+        left = RSA._fiat_tree(values[:half], exponents[:half], prime)
+        right = RSA._fiat_tree(values[half:], exponents[half:], prime)
+        v = pow(left[0], right[1], prime) * pow(right[0], left[1], prime) % prime
+        return (v, left[1] * right[1], left, right)
+
+    @staticmethod
+    def _fiat_split(node: tuple, root: int, prime: int, out: List[int]) -> None:
+        """
+        Split the root of a node into the roots of its children, left to right into out.
+        With X = 0 (mod e_left) and X = 1 (mod e_right):
+        root^X = m_right * v_right^((X - 1) / e_right) * v_left^(X / e_left).
+        """
+        _, _, left, right = node
+        if left is None:
+            out.append(root)
+            return
+        x = left[1] * pow(left[1], -1, right[1])
+        divisor = pow(right[0], (x - 1) // right[1], prime) * pow(left[0], x // left[1], prime) % prime
+        m_right = pow(root, x, prime) * pow(divisor, -1, prime) % prime
+        m_left = root * pow(m_right, -1, prime) % prime
+        RSA._fiat_split(left, m_left, prime, out)
+        RSA._fiat_split(right, m_right, prime, out)
+
+    @staticmethod
+    def _fiat_roots(values: List[int], exponents: List[int], prime: int) -> List[int]:
+        """
+        values[i]^(1/exponents[i]) mod prime with a single full-size exponentiation.
+        """
+        if any(v == 0 for v in values):  # the tree divides by every value
+            return [pow(v, pow(e, -1, prime - 1), prime) for v, e in zip(values, exponents)]
+        tree = RSA._fiat_tree(values, exponents, prime)
+        out = []
+        RSA._fiat_split(tree, pow(tree[0], pow(tree[1], -1, prime - 1), prime), prime, out)
+        return out
+
+    def decrypt_chunks_batch(self, chunks: List[bytes], exponents: List[int], chunk_size: int) -> List[bytes]:
+        """
+        Fiat's batch RSA: decrypt chunks[i], encrypted under exponents[i], with one
+        exponentiation mod p and one mod q for the whole batch instead of two per chunk.
+        Same output as decrypt_chunk(chunks[i], chunk_size, exponents[i]).
+
+        :param exponents: Small public exponents, coprime with each other and with
+            totient(n) (see batch_exponents()).
+        """
+        if len(chunks) != len(exponents):
+            raise ValueError("Need one exponent per chunk.")
+        product = 1
+        for e in exponents:
+            if gcd(e, self.phi) != 1 or gcd(e, product) != 1:
+                raise ValueError("Exponents must be coprime with totient(n) and with each other.")
+            product *= e
+        if not chunks:
+            return []
+        values = [int.from_bytes(chunk, byteorder='big') for chunk in chunks]
+        roots_p = RSA._fiat_roots([c % self.p for c in values], exponents, self.p)
+        roots_q = RSA._fiat_roots([c % self.q for c in values], exponents, self.q)
+        return [(m2 + self.q * ((self.qinv * (m1 - m2)) % self.p)).to_bytes(chunk_size, byteorder='big')
+                for m1, m2 in zip(roots_p, roots_q)]
+
+    #: Inputs with fewer chunks than this stay in-process; pool start-up would dominate
+    PARALLEL_MIN_CHUNKS = 4
+
+    #: Key fields sent to the pool workers per chunk operation
+    _WORKER_FIELDS = {
+        "encrypt_chunk": ("n", "e"),
+        "decrypt_chunk": ("n", "p", "q", "dp", "dq", "qinv"),
+    }
+
+    def _chunked_into(self, data, out, transform, workers: Optional[int] = None) -> int:
+        """
+        Apply transform(chunk, chunk_size) to every chunk of data and write the results
+        into out, reading through a memoryview. With workers > 1 and at least
+        PARALLEL_MIN_CHUNKS chunks, they are spread over a process pool (see _chunked_parallel).
         """
         chunk_size = (self.n.bit_length() + 7) // 8
-        num_chunks = ceil(len(data) / chunk_size)
-        res = []
-        for i in range(num_chunks):
-            start =i*chunk_size
-            chunk = data[start:start+chunk_size]
-            res.append(self.encrypt_chunk(chunk,chunk_size))
+        src = memoryview(data).cast('B')
+        dst = memoryview(out).cast('B')
+        total = ceil(len(src) / chunk_size) * chunk_size
+        if len(dst) < total:
+            raise ValueError(f"Output buffer must hold at least {total} bytes.")
+        if workers is not None and workers > 1 and len(src) >= RSA.PARALLEL_MIN_CHUNKS * chunk_size:
+            self._chunked_parallel(src, dst, transform.__name__, chunk_size, workers)
+            return total
+        for start in range(0, len(src), chunk_size):
+            dst[start:start + chunk_size] = transform(src[start:start + chunk_size], chunk_size)
+        return total
+
+    def _chunked_parallel(self, src: memoryview, dst: memoryview, method: str, chunk_size: int,
+                          workers: int) -> None:
+        """
+        Process pool variant of the chunk loop. The pool initializer hands every worker
+        once only the key fields the direction needs (n and e to encrypt, n and the CRT
+        parameters to decrypt; never d); tasks are runs of whole chunks (about four per
+        worker, to balance load) and executor.map returns them in input order.
+        """
+        fields = RSA._WORKER_FIELDS[method]
+        num_chunks = ceil(len(src) / chunk_size)
+        step = ceil(num_chunks / (4 * workers)) * chunk_size
+        tasks = [(method, bytes(src[start:start + step])) for start in range(0, len(src), step)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_rsa_worker,
+                                 initargs=({name: getattr(self, name) for name in fields},)) as executor:
+            start = 0
+            for result in executor.map(_rsa_segment, tasks):
+                dst[start:start + len(result)] = result
+                start += len(result)
+
+    def encrypt_into(self, data, out, workers: Optional[int] = None) -> int:
+        """
+        Encrypts data using chunking into a writable buffer of
+        ceil(len(data) / chunk_size) * chunk_size bytes. Returns the number of bytes written.
+
+        :param workers: Number of processes sharing the chunks (default: this process only).
+        """
+        return self._chunked_into(data, out, self.encrypt_chunk, workers)
+
+    def decrypt_into(self, data, out, workers: Optional[int] = None) -> int:
+        """
+        Decrypts data using chunking into a writable buffer. Returns the number of bytes written.
+        """
+        return self._chunked_into(data, out, self.decrypt_chunk, workers)
 
-        return b''.join(res)
+    def encrypt(self, data: bytes, workers: Optional[int] = None) -> bytes:
+        """
+        Encrypts data using chunking.
+        """
+        chunk_size = (self.n.bit_length() + 7) // 8
+        out = bytearray(ceil(len(data) / chunk_size) * chunk_size)
+        self.encrypt_into(data, out, workers)
+        return bytes(out)
 
-    def decrypt(self, data: bytes) -> bytes:
+    def decrypt(self, data: bytes, workers: Optional[int] = None) -> bytes:
         """
         Decrypts data using chunking.
         """
-        chunk_size = (self.n.bit_length() + 7) // 8 
-        num_chunks = ceil(len(data) / chunk_size)
-        res = []
-        for i in range(num_chunks):
-            start =i*chunk_size
-            chunk = data[start:start+chunk_size]
-            res.append(self.decrypt_chunk(chunk,chunk_size))
-            
-        return b''.join(res)
+        chunk_size = (self.n.bit_length() + 7) // 8
+        out = bytearray(ceil(len(data) / chunk_size) * chunk_size)
+        self.decrypt_into(data, out, workers)
+        return bytes(out)
+
+
+# Per-process state of the _chunked_parallel() workers
+_worker_rsa = None
+
+def _init_rsa_worker(fields: dict) -> None:
+    """
+    Rebuild a partial key holding only the given fields (see RSA._WORKER_FIELDS).
+    """
+    global _worker_rsa
+    _worker_rsa = RSA.__new__(RSA)
+    _worker_rsa.__dict__.update(fields)
+
+def _rsa_segment(task: Tuple[str, bytes]) -> bytes:
+    method, segment = task
+    transform = getattr(_worker_rsa, method)
+    chunk_size = (_worker_rsa.n.bit_length() + 7) // 8
+    return b''.join(transform(segment[start:start + chunk_size], chunk_size)
+                    for start in range(0, len(segment), chunk_size))
 
 if __name__ == "__main__":
     'this is the main func'
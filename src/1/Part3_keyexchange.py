@@ -1,10 +1,11 @@
 from typing import List
 import sympy  # use this or other modules for generating required prime numbers
 from typing import Tuple,Optional
-import random
+from keystore import KEY_STORE, rsa_parameters
 from math import ceil
 import secrets
 import sys
+from key_cache import SCHEDULE_CACHE
 class AES:
     # =============================================================================
     #                            AES CONSTANTS
@@ -89,7 +90,7 @@ class AES:
         """
         self.key = key
         len_key = len(key)
-        self.expanded_key = self.key_expansion(key)
+        self.expanded_key = SCHEDULE_CACHE.get("aes-expanded", key, lambda k: tuple(AES.key_expansion(k)))
         self.Nr = AES.KEY_SIZES[len_key][1]
 
 
@@ -579,9 +580,7 @@ class DES:
         """
         self.key = key
         self.method = method
-        key_int = int.from_bytes(key, 'big')
-        key_bits = DES._int_to_bits(key_int, 64)
-        self.subkeys = DES.generate_subkeys(key_bits)
+        self.subkeys = SCHEDULE_CACHE.get("des", key, DES.build_subkeys)
 
 
     # -----------------------------------------------------------------------------
@@ -686,6 +685,14 @@ class DES:
             subkeys.append(subkey)
         return subkeys
 
+    @staticmethod
+    def build_subkeys(key: bytes) -> Tuple[Tuple[int, ...], ...]:
+        """
+        Subkeys for an 8-byte key as read-only tuples (the form kept in key_cache.SCHEDULE_CACHE).
+        """
+        key_bits = DES._int_to_bits(int.from_bytes(key, 'big'), 64)
+        return tuple(tuple(subkey) for subkey in DES.generate_subkeys(key_bits))
+
     # -----------------------------------------------------------------------------
     #                           FEISTEL FUNCTION
     # -----------------------------------------------------------------------------
@@ -856,28 +863,32 @@ class RSA:
     Supports encryption and decryption with *chunking*.
     """
 
-    def __init__(self, bit_size: int = 1024, e: int = 65537,p=None, q=None, seed=42):
+    def __init__(self, bit_size: int = 1024, e: int = 65537,p=None, q=None, seed=None):
         """
         Initialize RSA with a specified bit_size for p and q.
 
         :param bit_size: Bit length for each prime p and q.
+        :param seed: None (default) draws a fresh random key that is never stored; an explicit
+            seed gives a reproducible, publicly derivable key (tests and benchmarks only).
         """
-        random.seed(seed)
         if p is None or q is None:
-            while True:
-                p = sympy.randprime(2**(bit_size - 1), 2**bit_size)
-                q = sympy.randprime(2**(bit_size - 1), 2**bit_size)
-                if p != q:
-                    break
-        
-        self.p = p
-        self.q = q
-        self.n = p * q
-        self.phi = (p - 1) * (q - 1)
-        if sympy.gcd(e,self.n)!=1:
-            raise ValueError("e must be coprime with φ(n)")
+            # seeded keys are generated once per (bit_size, seed, e), afterwards loaded from the key store
+            key = KEY_STORE.rsa(bit_size, seed, e)
+        else:
+            if sympy.gcd(e,p * q)!=1:
+                raise ValueError("e must be coprime with φ(n)")
+            key = rsa_parameters(p, q, e)
+
+        self.p = key["p"]
+        self.q = key["q"]
+        self.n = key["n"]
+        self.phi = (self.p - 1) * (self.q - 1)
         self.e = e
-        self.d = pow(e,-1,self.phi)
+        self.d = key["d"]
+        # CRT parameters for decryption
+        self.dp = key["dp"]
+        self.dq = key["dq"]
+        self.qinv = key["qinv"]
 
     def get_public_key(self) -> Tuple[int, int]:
         """
@@ -901,7 +912,24 @@ class RSA:
 
     def decrypt_chunk(self, chunk: bytes,chunk_size:int) -> bytes:
         """
-        Decrypts a single chunk of bytes.
+        Decrypts a single chunk of bytes with the CRT: two half-size exponentiations
+        mod p and q, recombined with Garner's formula.
+        """
+        c = int.from_bytes(chunk, byteorder='big')
+        m = self.crt_power(c)
+        return m.to_bytes(chunk_size, byteorder='big')
+
+    def crt_power(self, c: int) -> int:
+        """
+        c^d mod n computed as m2 + q * (qinv * (m1 - m2) mod p).
+        """
+        m1 = pow(c % self.p, self.dp, self.p)
+        m2 = pow(c % self.q, self.dq, self.q)
+        return m2 + self.q * ((self.qinv * (m1 - m2)) % self.p)
+
+    def decrypt_chunk_no_crt(self, chunk: bytes,chunk_size:int) -> bytes:
+        """
+        Decrypts a single chunk of bytes with one full-size exponentiation (reference).
         """
         m = int.from_bytes(chunk, byteorder='big')
         c = pow(m, self.d ,self.n)
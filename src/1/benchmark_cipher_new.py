@@ -1,10 +1,20 @@
 import time
 import secrets
-from Part1_DES import DES
+from Part1_DES import DES, TripleDES
 from Part1_AES import AES
 from Part2_RSA import RSA
+from hybrid import HybridRSA
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from math import ceil
+import hashlib
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cryptography"))
+from godel import GODEL  # noqa: E402
+
+#: Seed of the RSA keys the RSA benchmarks share, so repeated runs can load them from the key store
+BENCH_SEED = 42
 
 def bench(name,cipher_tuple,tests):
     cipher = cipher_tuple[0](*cipher_tuple[1])
@@ -21,6 +31,128 @@ def bench(name,cipher_tuple,tests):
         dec_times.append(end-start)
     return name,(sum(enc_times)/len(enc_times),sum(dec_times)/len(dec_times))
 
+def bench_aes_engines(size=64 * 1024):
+    """
+    Throughput of the AES block engines on one larger message, where batching
+    engines (bitsliced) are not dominated by per-call set-up.
+    """
+    key = secrets.token_bytes(16)
+    data = secrets.token_bytes(size)
+    print(f"{'AES engine':<15} {'Enc(ms/KiB)':>12} {'Dec(ms/KiB)':>12}")
+    print("-"*60)
+    for engine in AES.ENGINES:
+        if engine == "reference":
+            continue
+        name, (e, d) = bench(engine, (AES, (key, engine)), [data])
+        print(f"{name:<15} {e*1000*1024/size:12.3f} {d*1000*1024/size:12.3f}")
+
+def bench_godel_round_functions(count=100000):
+    """
+    GODEL round-function evaluations per second: the fresh-hash round, the midstate-copy
+    keyed round, and whole blocks for both variants.
+    """
+    key = b"powyrlsiqlmfyrus"
+    subkeys = GODEL.subkey_digests(key)
+    subkey = int.from_bytes(subkeys[0], 'big')
+    midstate = GODEL.round_midstates(subkeys)[0]
+    right = int.from_bytes(b"right half bytes", 'big')
+
+    start = time.time()
+    for _ in range(count):
+        hashlib.sha256((right ^ subkey).to_bytes(16, 'big')).digest()
+    fresh = count / (time.time() - start)
+
+    start = time.time()
+    for _ in range(count):
+        h = midstate.copy()
+        h.update(right.to_bytes(16, 'big'))
+        h.digest()
+    keyed = count / (time.time() - start)
+
+    print(f"{'GODEL round':<16} {'per second':>12}")
+    print("-"*60)
+    print(f"{'hash':<16} {fresh:12.0f} hashes")
+    print(f"{'keyed (midstate)':<16} {keyed:12.0f} hashes")
+    block = bytes(range(32))
+    for variant in GODEL.ROUND_FUNCTIONS:
+        cipher = GODEL(key, "integer", variant)
+        blocks = count // GODEL.num_rounds
+        start = time.time()
+        for _ in range(blocks):
+            cipher.encrypt_block(block)
+        print(f"{variant + ' block':<16} {blocks / (time.time() - start):12.0f} blocks")
+
+def bench_rsa_keygen(bit_sizes=(512, 1024, 1536)):
+    """
+    RSA key generation time (prime search for p and q); RSA-N is RSA(N) as in the table above.
+    Random keys (no seed) bypass the key store, so this always measures generation.
+    """
+    print(f"{'RSA keygen':<15} {'time(s)':>9}")
+    print("-"*60)
+    for bit_size in bit_sizes:
+        start = time.time()
+        RSA(bit_size)
+        print(f"RSA-{bit_size:<11} {time.time() - start:9.3f}")
+
+def bench_rsa_crt(bit_sizes=(1024, 3072), n_chunks=8):
+    """
+    RSA decryption per chunk: one full exponentiation mod n against CRT (mod p and q).
+    """
+    print(f"{'RSA decrypt':<15} {'full(ms)':>9} {'CRT(ms)':>9} {'speedup':>8}")
+    print("-"*60)
+    for bit_size in bit_sizes:
+        rsa = RSA(bit_size, seed=BENCH_SEED)
+        chunk_size = (rsa.n.bit_length() + 7) // 8
+        chunks = [rsa.encrypt_chunk(secrets.token_bytes(chunk_size - 1), chunk_size) for _ in range(n_chunks)]
+        start = time.time()
+        for chunk in chunks:
+            rsa.decrypt_chunk_no_crt(chunk, chunk_size)
+        full = (time.time() - start) / n_chunks
+        start = time.time()
+        for chunk in chunks:
+            rsa.decrypt_chunk(chunk, chunk_size)
+        crt = (time.time() - start) / n_chunks
+        print(f"RSA-{bit_size:<11} {full*1000:9.3f} {crt*1000:9.3f} {full/crt:7.2f}x")
+
+def bench_rsa_batch(bit_size=1024, batch_sizes=(4, 8, 16)):
+    """
+    Amortized decryption cost per message: decrypt_chunk per message against
+    Fiat's batch RSA (one exponentiation mod p and mod q per batch).
+    """
+    rsa = RSA(bit_size, seed=BENCH_SEED)
+    chunk_size = (rsa.n.bit_length() + 7) // 8
+    print(f"RSA-{bit_size} batch {'loop(ms/msg)':>13} {'batch(ms/msg)':>14} {'speedup':>8}")
+    print("-"*60)
+    for count in batch_sizes:
+        exponents = rsa.batch_exponents(count)
+        chunks = [rsa.encrypt_chunk(secrets.token_bytes(chunk_size - 1), chunk_size, e) for e in exponents]
+        start = time.time()
+        for chunk, e in zip(chunks, exponents):
+            rsa.decrypt_chunk(chunk, chunk_size, e)
+        loop = (time.time() - start) / count
+        start = time.time()
+        rsa.decrypt_chunks_batch(chunks, exponents, chunk_size)
+        batch = (time.time() - start) / count
+        print(f"{count:>14} {loop*1000:13.3f} {batch*1000:14.3f} {loop/batch:7.2f}x")
+
+def bench_rsa_workers(bit_size=1024, n_chunks=32, workers=None):
+    """
+    Multi-chunk RSA decryption in this process against a process pool.
+    """
+    workers = workers or os.cpu_count() or 1
+    rsa = RSA(bit_size, seed=BENCH_SEED)
+    chunk_size = (rsa.n.bit_length() + 7) // 8
+    cipher_text = rsa.encrypt(secrets.token_bytes(n_chunks * chunk_size))
+    print(f"RSA-{bit_size} {n_chunks} chunks {'1 process(ms)':>14} {f'{workers} workers(ms)':>15}")
+    print("-"*60)
+    start = time.time()
+    rsa.decrypt(cipher_text)
+    serial = time.time() - start
+    start = time.time()
+    rsa.decrypt(cipher_text, workers=workers)
+    parallel = time.time() - start
+    print(f"{'decrypt':<19} {serial*1000:14.1f} {parallel*1000:15.1f}")
+
 def main():
     n_tests = 15
     tests = []
@@ -32,6 +164,7 @@ def main():
 
 
     des_key = secrets.token_bytes(8)   
+    tdes_key = secrets.token_bytes(24)
     aes128_key = secrets.token_bytes(16) 
     aes192_key = secrets.token_bytes(24)  
     aes256_key = secrets.token_bytes(32)  
@@ -39,13 +172,21 @@ def main():
     ciphers = {
         "DES": (DES,(des_key, "standard")),
         "DES_Xor_based": (DES,(des_key, "xor_based")),
+        "DES-ref": (DES,(des_key, "standard", "reference")),
+        "3DES": (TripleDES,(tdes_key,)),
         "AES-128": (AES,(aes128_key,)),
         "AES-192": (AES,(aes192_key,)),
         "AES-256": (AES,(aes256_key,)),
+        "AES-128-ref": (AES,(aes128_key, "reference")),
+        "AES-256-ref": (AES,(aes256_key, "reference")),
+        "AES-128-bitsl": (AES,(aes128_key, "bitsliced")),
+        "AES-256-bitsl": (AES,(aes256_key, "bitsliced")),
         "RSA-1024": (RSA,(2024,)),
         "RSA-3072": (RSA,(3072,)),
         # "RSA-7680": (RSA,(7680,)),
         # "RSA-15360": (RSA,(15360,)),
+        "RSA-1024-KEM": (HybridRSA,(RSA(2024),)),
+        "RSA-3072-KEM": (HybridRSA,(RSA(3072),)),
     }
 
     with ProcessPoolExecutor() as executor:
@@ -65,6 +206,18 @@ def main():
     for name, vals in results.items():
         e,d = vals
         print(f"{name:<15} {e*1000:8.3f} {d*1000:8.3f}")
+    print()
+    bench_aes_engines()
+    print()
+    bench_godel_round_functions()
+    print()
+    bench_rsa_crt()
+    print()
+    bench_rsa_batch()
+    print()
+    bench_rsa_workers()
+    print()
+    bench_rsa_keygen()
 
 if __name__=="__main__":
     main()
@@ -0,0 +1,304 @@
+import secrets
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from Part1_DES import DES
+
+#: Symbolic bit standing for the constant 1 (key bit i is 1 << i, i = 0 for the most significant key bit)
+CONSTANT = 1 << 64
+
+FULL = 0xFFFFFFFF
+
+Pair = Tuple[bytes, bytes]
+
+
+# -----------------------------------------------------------------------------
+#                   XOR_BASED: THE CIPHER IS AFFINE OVER GF(2)
+# -----------------------------------------------------------------------------
+
+def symbolic_encrypt_xor(plaintext: bytes) -> List[int]:
+    """
+    Run xor_based DES on symbolic bits. Every bit is an int: bit i is the coefficient of
+    key bit i and CONSTANT the constant term. The repo's own generate_subkeys, E_TABLE
+    permutation and feistel_function do the work, since they only permute and XOR.
+
+    :return: The 64 ciphertext bits as affine expressions of the key bits.
+    """
+    subkeys = DES.generate_subkeys([1 << i for i in range(64)])
+    bits = [CONSTANT if bit else 0 for bit in DES._int_to_bits(int.from_bytes(plaintext, 'big'), 64)]
+    permuted = DES._permute(bits, DES.IP_TABLE)
+    left, right = permuted[:32], permuted[32:]
+    for subkey in subkeys:
+        left, right = right, DES._xor_bits(DES.feistel_function(right, subkey, method="xor_based"), left)
+    return DES._permute(right + left, DES.FP_TABLE)
+
+
+def linear_system_xor(pairs: Sequence[Pair]) -> List[int]:
+    """
+    Rows of the system over the 64 key bit positions: coefficient bits 0..63, right-hand side at bit 64.
+    Only 56 columns can be non-zero (the parity bits never reach a subkey).
+    """
+    rows = []
+    for plaintext, ciphertext in pairs:
+        target = DES._int_to_bits(int.from_bytes(ciphertext, 'big'), 64)
+        for expression, bit in zip(symbolic_encrypt_xor(plaintext), target):
+            rows.append(expression ^ (CONSTANT if bit else 0))
+    return rows
+
+
+def solve_gf2(rows: List[int], num_vars: int) -> Tuple[Optional[int], int]:
+    """
+    Gaussian elimination over GF(2). Row bit j (< num_vars) is the coefficient of variable j,
+    bit num_vars the right-hand side.
+
+    :return: (one solution with all free variables 0, or None if inconsistent; rank)
+    """
+    rhs = 1 << num_vars
+    pivots = []
+    rows = list(rows)
+    rank = 0
+    for column in range(num_vars):
+        bit = 1 << column
+        pivot = next((i for i in range(rank, len(rows)) if rows[i] & bit), None)
+        if pivot is None:
+            continue
+        rows[rank], rows[pivot] = rows[pivot], rows[rank]
+        for i in range(len(rows)):
+            if i != rank and rows[i] & bit:
+                rows[i] ^= rows[rank]
+        pivots.append(column)
+        rank += 1
+    if any(row == rhs for row in rows[rank:]):
+        return None, rank
+    solution = 0
+    for i, column in enumerate(pivots):
+        if rows[i] & rhs:
+            solution |= 1 << column
+    return solution, rank
+
+
+def recover_key_xor(pairs: Sequence[Pair]) -> bytes:
+    """
+    Recover a key for DES(method="xor_based") from known plaintext/ciphertext pairs.
+    The ciphertext is L(P) ^ M(K) with M independent of the plaintext, so one pair already
+    fixes M(K); every key in the solution space encrypts exactly like the real one.
+    Parity bits are returned as 0.
+    """
+    solution, _ = solve_gf2(linear_system_xor(pairs), 64)
+    if solution is None:
+        raise ValueError("Pairs are inconsistent with xor_based DES under any key.")
+    key = sum(1 << (63 - i) for i in range(64) if (solution >> i) & 1)
+    return key.to_bytes(8, 'big')
+
+
+# -----------------------------------------------------------------------------
+#           AND_BASED: GUESS-AND-DETERMINE WITH THREE-VALUED PROPAGATION
+# -----------------------------------------------------------------------------
+
+def _expand32(value: int) -> int:
+    """
+    Leading 32 bits of the E-expansion (the only ones the xor/and-based rounds use).
+    """
+    e0, e1, e2, e3 = DES.E_LUT
+    return (e0[value >> 24] | e1[(value >> 16) & 0xFF] | e2[(value >> 8) & 0xFF] | e3[value & 0xFF]) >> 16
+
+
+def _merge(values: List[int], known: List[int], i: int, value: int, mask: int) -> bool:
+    """
+    Merge new knowledge (value on the bits in mask) into position i. False on a contradiction.
+    """
+    value &= mask
+    if (values[i] ^ value) & known[i] & mask:
+        return False
+    values[i] |= value
+    known[i] |= mask
+    return True
+
+
+class AndBasedKeySearch:
+    """
+    Key search for DES(method="and_based"), where a round is R' = L ^ (E(R)[:32] & K[:32]).
+
+    Every intermediate half is tracked per pair as (value, known) masks. Propagation runs
+    forward from the plaintexts and backward from the ciphertexts and merges both sides at
+    every round boundary, so the two directions meet in the middle. Once f = L_i ^ R_(i+1)
+    is known in a round, the key is determined where it matters: f = 1 forces the key bit
+    to 1, f = 0 under a known E bit of 1 forces it to 0, and key bits only ever ANDed with
+    a 0 are never guessed. The search branches only on key bits that are actually used,
+    preferring those near the ends, and a contradiction anywhere prunes the branch.
+    """
+
+    def __init__(self, pairs: Sequence[Pair], known_key: bytes = bytes(8), known_mask: int = 0):
+        """
+        :param pairs: Known (plaintext, ciphertext) pairs; more pairs prune harder.
+        :param known_key: Values of key bits that are already known (reduced key spaces).
+        :param known_mask: 64-bit mask of the known bits of known_key (most significant = key bit 0).
+        """
+        self.pairs = list(pairs)
+        self.known_value = int.from_bytes(known_key, 'big') & known_mask
+        self.known_mask = known_mask
+        self.nodes = 0
+        # round key (32 bits used) as byte lookups on the 64-bit key
+        self.round_luts = [DES.build_permutation_lut([bit + 1 for bit in subkey[:32]], 64)
+                           for subkey in DES.BS_KEY_BITS]
+        # key bit mask set by round-key bit j (j = 0 most significant) of round r
+        self.key_bit = [[1 << (63 - subkey[j]) for j in range(32)] for subkey in DES.BS_KEY_BITS]
+
+    def _initial_states(self) -> List[List[int]]:
+        states = []
+        for plaintext, ciphertext in self.pairs:
+            lv, lk, rv, rk = [0] * 17, [0] * 17, [0] * 17, [0] * 17
+            value = DES._permute_lut(int.from_bytes(plaintext, 'big'), DES.IP_LUT)
+            lv[0], rv[0], lk[0], rk[0] = value >> 32, value & FULL, FULL, FULL
+            value = DES._permute_lut(int.from_bytes(ciphertext, 'big'), DES.IP_LUT)  # IP undoes FP: R16 || L16
+            rv[16], lv[16], rk[16], lk[16] = value >> 32, value & FULL, FULL, FULL
+            states.append([lv, lk, rv, rk])
+        return states
+
+    def _round_key(self, kv: int, kk: int, rnd: int) -> Tuple[int, int]:
+        lut = self.round_luts[rnd]
+        return DES._permute_lut(kv, lut), DES._permute_lut(kk, lut)
+
+    @staticmethod
+    def _f(rv: int, rk: int, kv: int, kk: int) -> Tuple[int, int]:
+        """
+        Three-valued E(R) & K: a bit is known if both inputs are, or either is a known 0.
+        """
+        ev, ek = _expand32(rv), _expand32(rk)
+        fk = ((ek & kk) | (ek & ~ev) | (kk & ~kv)) & FULL
+        return ev & kv & fk, fk
+
+    def _propagate(self, states: List[List[int]], kv: int, kk: int) -> Optional[Tuple[int, int]]:
+        """
+        Run forward/backward passes and key deduction to a fixpoint.
+
+        :return: The extended key knowledge, or None on a contradiction.
+        """
+        f = AndBasedKeySearch._f
+        while True:
+            before = kk
+            round_keys = [self._round_key(kv, kk, rnd) for rnd in range(16)]
+            for lv, lk, rv, rk in states:
+                for i in range(16):  # forward: L' = R, R' = L ^ f(R)
+                    fv, fk = f(rv[i], rk[i], *round_keys[i])
+                    if not (_merge(lv, lk, i + 1, rv[i], rk[i])
+                            and _merge(rv, rk, i + 1, lv[i] ^ fv, lk[i] & fk)):
+                        return None
+                for i in range(15, -1, -1):  # backward: R = L', L = R' ^ f(R)
+                    if not _merge(rv, rk, i, lv[i + 1], lk[i + 1]):
+                        return None
+                    fv, fk = f(rv[i], rk[i], *round_keys[i])
+                    if not _merge(lv, lk, i, rv[i + 1] ^ fv, rk[i + 1] & fk):
+                        return None
+                for i in range(16):  # determine key bits from known round outputs
+                    out_k = lk[i] & rk[i + 1]
+                    if not out_k:
+                        continue
+                    out_v = (lv[i] ^ rv[i + 1]) & out_k
+                    ev, ek = _expand32(rv[i]), _expand32(rk[i])
+                    if out_v & ek & ~ev:
+                        return None
+                    ones = out_v
+                    zeros = out_k & ~out_v & ek & ev
+                    for mask, bit_value in ((ones, 1), (zeros, 0)):
+                        while mask:
+                            low = mask & -mask
+                            mask ^= low
+                            key_bit = self.key_bit[i][32 - low.bit_length()]
+                            if kk & key_bit:
+                                if bool(kv & key_bit) != bit_value:
+                                    return None
+                            else:
+                                kk |= key_bit
+                                if bit_value:
+                                    kv |= key_bit
+            if kk == before:
+                return kv, kk
+
+    def _branch_bit(self, states: List[List[int]], kv: int, kk: int) -> Optional[int]:
+        """
+        Pick the unknown key bit that feeds the most rounds with a known E bit of 1, over all
+        pairs. Rounds near either end weigh more, so forward and backward knowledge grow
+        towards each other and meet in the middle.
+        None means every half of every pair is known, i.e. the key fits all pairs.
+        """
+        scores = {}
+        for lv, lk, rv, rk in states:
+            for i in range(16):
+                if lk[i] == FULL and rk[i + 1] == FULL:
+                    continue
+                _, round_known = self._round_key(kv, kk, i)
+                candidates = _expand32(rk[i]) & _expand32(rv[i]) & ~round_known & FULL
+                weight = 16 >> min(i, 15 - i, 4)
+                key_bit = self.key_bit[i]
+                while candidates:
+                    low = candidates & -candidates
+                    candidates ^= low
+                    bit = key_bit[32 - low.bit_length()]
+                    scores[bit] = scores.get(bit, 0) + weight
+        if not scores:
+            return None
+        return max(scores, key=scores.get)
+
+    def search(self, max_nodes: Optional[int] = None) -> Optional[bytes]:
+        """
+        Depth-first guess-and-determine. Unknown key bits that never mattered are returned as 0.
+
+        :param max_nodes: Give up (return None) after this many search nodes.
+        """
+        self.nodes = 0
+        stack = [(self._initial_states(), self.known_value, self.known_mask)]
+        while stack:
+            states, kv, kk = stack.pop()
+            self.nodes += 1
+            if max_nodes is not None and self.nodes > max_nodes:
+                return None
+            result = self._propagate(states, kv, kk)
+            if result is None:
+                continue
+            kv, kk = result
+            bit = self._branch_bit(states, kv, kk)
+            if bit is None:
+                return kv.to_bytes(8, 'big')
+            for value in (bit, 0):  # explored in reverse: 0 first
+                stack.append(([[list(column) for column in pair] for pair in states], kv | value, kk | bit))
+        return None
+
+
+def recover_key_and(pairs: Sequence[Pair], known_key: bytes = bytes(8), known_mask: int = 0,
+                    max_nodes: Optional[int] = None) -> Optional[bytes]:
+    """
+    Recover a key for DES(method="and_based") consistent with all pairs (see AndBasedKeySearch).
+    """
+    return AndBasedKeySearch(pairs, known_key, known_mask).search(max_nodes)
+
+
+def main():
+    key = secrets.token_bytes(8)
+    cipher = DES(key, "xor_based")
+    pairs = [(p, cipher.encrypt_block(p)) for p in (secrets.token_bytes(8) for _ in range(2))]
+    start = time.perf_counter()
+    recovered = recover_key_xor(pairs)
+    elapsed = time.perf_counter() - start
+    _, rank = solve_gf2(linear_system_xor(pairs), 64)
+    check = secrets.token_bytes(8)
+    print(f"xor_based: rank {rank}, recovered {recovered.hex()} in {elapsed * 1000:.1f} ms, "
+          f"equivalent: {DES(recovered, 'xor_based').encrypt_block(check) == cipher.encrypt_block(check)}")
+
+    cipher = DES(key, "and_based")
+    pairs = [(p, cipher.encrypt_block(p)) for p in (secrets.token_bytes(8) for _ in range(4))]
+    for unknown in (16, 24, 32, 40, 48, 56):
+        known_mask = 0
+        for position in range(64):
+            if position % 8 != 7 and position >= unknown + unknown // 7:
+                known_mask |= 1 << (63 - position)
+        search = AndBasedKeySearch(pairs, key, known_mask)
+        start = time.perf_counter()
+        recovered = search.search(max_nodes=200000)
+        elapsed = time.perf_counter() - start
+        ok = recovered is not None and all(DES(recovered, "and_based").encrypt_block(p) == c for p, c in pairs)
+        print(f"and_based: {unknown} unknown key bits, {search.nodes} nodes, {elapsed:.2f} s, fits pairs: {ok}")
+
+
+if __name__ == "__main__":
+    main()
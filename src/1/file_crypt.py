@@ -0,0 +1,175 @@
+import argparse
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Optional, Tuple
+
+import modes
+from Part1_AES import AES
+from Part1_DES import DES
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cryptography"))
+from godel import GODEL  # noqa: E402
+
+#: Bytes read from the input map per step
+CHUNK_SIZE = 1 << 20
+
+BlockFunction = Callable[[bytes], bytes]
+
+
+def build_cipher(name: str, key: bytes, engine: str = "ttable") -> Tuple[BlockFunction, BlockFunction, int]:
+    """
+    Return (encrypt_block, decrypt_block, block_size) for the chosen cipher.
+    """
+    if name == "aes":
+        encrypt_block, decrypt_block = AES(key, engine, cache=False).block_functions()
+        return encrypt_block, decrypt_block, 16
+    if name == "des":
+        des = DES(key, "standard", cache=False)
+        return des.encrypt_block, des.decrypt_block, 8
+    if name == "godel":
+        godel = GODEL(key)
+        return godel.encrypt_block, godel.decrypt_block, GODEL.block_size // 8
+    raise ValueError("Invalid cipher! Choose 'aes', 'des' or 'godel'.")
+
+
+def output_size(operation: str, mode: str, length: int, block_size: int) -> int:
+    """
+    Upper bound of the output length; decryption output is truncated once the padding is known.
+    """
+    if operation == "encrypt" and mode != "ctr":
+        return length - length % block_size + block_size
+    return length
+
+
+class Progress:
+    """
+    Prints processed bytes and throughput to stderr, at most a few times per second.
+    """
+
+    def __init__(self, total: int, enabled: bool):
+        self.total = total
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self._last = 0.0
+
+    def update(self, done: int) -> None:
+        now = time.perf_counter()
+        if not self.enabled or now - self._last < 0.5:
+            return
+        self._last = now
+        rate = done / max(now - self.start, 1e-9) / (1 << 20)
+        percent = 100 * done / self.total if self.total else 100
+        print(f"\r{done}/{self.total} bytes ({percent:5.1f}%) {rate:8.2f} MiB/s", end="", file=sys.stderr)
+
+    def finish(self, done: int) -> None:
+        if not self.enabled:
+            return
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        print(f"\r{done}/{self.total} bytes in {elapsed:.2f} s ({done / elapsed / (1 << 20):.2f} MiB/s)",
+              file=sys.stderr)
+
+
+def check_input_length(operation: str, mode: str, length: int, block_size: int) -> None:
+    """
+    Reject ECB/CBC ciphertexts that are empty or not a whole number of blocks before any
+    output is produced.
+    """
+    if operation == "decrypt" and mode != "ctr" and (length == 0 or length % block_size):
+        raise ValueError(f"Ciphertext length must be a non-zero multiple of {block_size} bytes.")
+
+
+def crypt_file(src_path: str, dst_path: Optional[str], operation: str, cipher: str, key: bytes,
+               mode: str, iv: Optional[bytes] = None, engine: str = "ttable",
+               show_progress: bool = False) -> int:
+    """
+    Encrypt or decrypt a file through a memory map, streaming CHUNK_SIZE pieces through
+    the chosen mode. Output goes to a temporary file next to the destination that
+    replaces it (os.replace) only once the whole stream, padding check included, has
+    succeeded; with dst_path None the input file itself is replaced. A failure therefore
+    never leaves a half-written output or a destroyed input.
+
+    :return: Length of the output file.
+    """
+    encrypt_block, decrypt_block, block_size = build_cipher(cipher, key, engine)
+    factory = modes.encryptor if operation == "encrypt" else modes.decryptor
+    stream = factory(mode, encrypt_block, decrypt_block, block_size, iv)
+
+    length = os.path.getsize(src_path)
+    check_input_length(operation, mode, length, block_size)
+    out_length = output_size(operation, mode, length, block_size)
+    dst_path = dst_path or src_path
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(dst_path)), suffix=".tmp")
+    try:
+        with open(src_path, "rb") as src_file, os.fdopen(fd, "w+b") as dst_file:
+            if not length:  # nothing to map; ECB/CBC encryption still emits a padding block
+                out = stream.finalize()
+                dst_file.write(out)
+                written = len(out)
+            else:
+                dst_file.truncate(out_length)
+                written = _crypt_mapped(stream, src_file, dst_file, length, show_progress)
+                dst_file.truncate(written)
+        shutil.copymode(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written
+
+
+def _crypt_mapped(stream: modes.BlockModeStream, src_file, dst_file, length: int, show_progress: bool) -> int:
+    """
+    Stream the mapped input through the mode into the mapped output.
+
+    :return: Number of bytes written.
+    """
+    src_map = mmap.mmap(src_file.fileno(), 0, access=mmap.ACCESS_READ)
+    dst_map = mmap.mmap(dst_file.fileno(), 0, access=mmap.ACCESS_WRITE)
+    progress = Progress(length, show_progress)
+    written = 0
+    try:
+        for start in range(0, length, CHUNK_SIZE):
+            out = stream.update(src_map[start:min(start + CHUNK_SIZE, length)])
+            dst_map[written:written + len(out)] = out
+            written += len(out)
+            progress.update(min(start + CHUNK_SIZE, length))
+        out = stream.finalize()
+        dst_map[written:written + len(out)] = out
+        written += len(out)
+        progress.finish(length)
+        dst_map.flush()
+    finally:
+        dst_map.close()
+        src_map.close()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encrypt or decrypt files with AES, DES or GODEL.")
+    parser.add_argument("operation", choices=["encrypt", "decrypt"])
+    parser.add_argument("input", help="input file")
+    parser.add_argument("-o", "--output", help="output file (default: replace the input)")
+    parser.add_argument("-c", "--cipher", choices=["aes", "des", "godel"], default="aes")
+    parser.add_argument("-k", "--key", required=True, help="key as hex")
+    parser.add_argument("-m", "--mode", choices=list(modes.MODES), default="ctr")
+    parser.add_argument("--iv", help="IV / initial counter block as hex (required for cbc and ctr)")
+    parser.add_argument("--engine", choices=list(AES.ENGINES), default="ttable", help="AES block engine")
+    parser.add_argument("-p", "--progress", action="store_true", help="report progress and throughput")
+    args = parser.parse_args()
+
+    iv = bytes.fromhex(args.iv) if args.iv else None
+    try:
+        crypt_file(args.input, args.output, args.operation, args.cipher, bytes.fromhex(args.key),
+                   args.mode, iv, args.engine, args.progress)
+    except ValueError as exc:  # e.g. bad padding: the input is left untouched
+        parser.exit(1, f"{parser.prog}: error: {exc}\n")
+
+
+if __name__ == "__main__":
+    main()
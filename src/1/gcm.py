@@ -0,0 +1,185 @@
+import hmac
+from typing import Callable, List, Tuple
+
+#: Reduction constant of GF(2^128) in GCM's bit-reflected representation
+R = 0xE1 << 120
+
+#: Counter blocks encrypted per keystream batch
+KEYSTREAM_BATCH = 256
+
+#: Tag lengths in bytes allowed by SP 800-38D (5.2.1.2); 4 and 8 only for short messages
+TAG_LENGTHS = (4, 8, 12, 13, 14, 15, 16)
+
+
+class GHASH:
+    """
+    GHASH with 8-bit multiplication tables for one hash key H.
+    TABLES[i][b] is (b placed in byte i of the block) * H, so a full multiplication
+    is 16 lookups and XORs instead of 128 shift/reduce steps.
+    """
+
+    def __init__(self, h: bytes):
+        """
+        :param h: 16-byte hash key (the block cipher applied to the zero block).
+        """
+        if len(h) != 16:
+            raise ValueError("Hash key must be 16 bytes.")
+        self.tables = GHASH.build_tables(int.from_bytes(h, 'big'))
+
+    @staticmethod
+    def mul_x(v: int) -> int:
+        """
+        Multiply by x in GF(2^128) (a right shift in the bit-reflected representation).
+        """
+        return (v >> 1) ^ R if v & 1 else v >> 1
+
+    @staticmethod
+    def gf_mul(x: int, y: int) -> int:
+        """
+        Bit-by-bit multiplication in GF(2^128) (SP 800-38D, Algorithm 1). Reference only.
+        """
+        z, v = 0, y
+        for i in range(127, -1, -1):
+            if (x >> i) & 1:
+                z ^= v
+            v = GHASH.mul_x(v)
+        return z
+
+    @staticmethod
+    def build_tables(h: int) -> List[List[int]]:
+        """
+        Build the 16 x 256 table of byte-position products with H.
+        """
+        # powers[j] = H * x^j; int bit p of a block stands for x^(127 - p)
+        powers = [h]
+        for _ in range(127):
+            powers.append(GHASH.mul_x(powers[-1]))
+        tables = []
+        for i in range(16):
+            table = [0] * 256
+            for k in range(8):
+                basis = powers[127 - (8 * (15 - i) + k)]
+                bit = 1 << k
+                for b in range(bit):
+                    table[bit | b] = table[b] ^ basis
+            tables.append(table)
+        return tables
+
+    def absorb(self, state: int, data: bytes) -> int:
+        """
+        Feed data into the GHASH state, zero-padding a trailing partial block.
+
+        :return: The new state.
+        """
+        t0, t1, t2, t3, t4, t5, t6, t7, t8, t9, t10, t11, t12, t13, t14, t15 = self.tables
+        view = memoryview(data)
+        length = len(view)
+        for start in range(0, length, 16):
+            block = view[start:start + 16]
+            y = int.from_bytes(block, 'big')
+            if len(block) < 16:
+                y <<= 8 * (16 - len(block))
+            b0, b1, b2, b3, b4, b5, b6, b7, b8, b9, b10, b11, b12, b13, b14, b15 = \
+                (state ^ y).to_bytes(16, 'big')
+            state = (t0[b0] ^ t1[b1] ^ t2[b2] ^ t3[b3] ^ t4[b4] ^ t5[b5] ^ t6[b6] ^ t7[b7]
+                     ^ t8[b8] ^ t9[b9] ^ t10[b10] ^ t11[b11] ^ t12[b12] ^ t13[b13] ^ t14[b14] ^ t15[b15])
+        return state
+
+    def digest(self, associated_data: bytes, ciphertext: bytes) -> bytes:
+        """
+        GHASH_H(A, C) over both inputs and the length block.
+        """
+        state = self.absorb(0, associated_data)
+        state = self.absorb(state, ciphertext)
+        lengths = ((8 * len(associated_data)) << 64) | (8 * len(ciphertext))
+        return self.absorb(state, lengths.to_bytes(16, 'big')).to_bytes(16, 'big')
+
+
+def _initial_counter(ghash: GHASH, nonce: bytes) -> int:
+    """
+    J0: nonce || 0^31 || 1 for 96-bit nonces, otherwise GHASH of the nonce.
+    """
+    if len(nonce) == 12:
+        return (int.from_bytes(nonce, 'big') << 32) | 1
+    return int.from_bytes(ghash.digest(b'', nonce), 'big')
+
+
+def _gctr(encrypt_blocks: Callable[[bytes], bytes], counter: int, data: bytes, ghash: GHASH,
+          state: int, hash_output: bool) -> Tuple[bytes, int]:
+    """
+    CTR with inc32 counters. The keystream is produced KEYSTREAM_BATCH blocks per call and
+    every batch is hashed right after it is XORed, so the data is traversed only once.
+    hash_output selects whether the output (encryption) or the input (decryption) is hashed.
+
+    :return: (output, GHASH state)
+    """
+    view = memoryview(data)
+    length = len(view)
+    out = bytearray(length)
+    prefix = counter & ~0xFFFFFFFF
+    low = counter & 0xFFFFFFFF
+    step = 16 * KEYSTREAM_BATCH
+    for start in range(0, length, step):
+        chunk = view[start:start + step]
+        num_blocks = -(-len(chunk) // 16)
+        counters = b''.join((prefix | ((low + i) & 0xFFFFFFFF)).to_bytes(16, 'big') for i in range(num_blocks))
+        low = (low + num_blocks) & 0xFFFFFFFF
+        keystream = encrypt_blocks(counters)
+        result = (int.from_bytes(chunk, 'big') ^ int.from_bytes(keystream[:len(chunk)], 'big')).to_bytes(len(chunk), 'big')
+        out[start:start + len(chunk)] = result
+        state = ghash.absorb(state, result if hash_output else chunk)
+    return bytes(out), state
+
+
+def _tag(encrypt_blocks: Callable[[bytes], bytes], ghash: GHASH, j0: int, state: int,
+         aad_length: int, data_length: int, tag_length: int) -> bytes:
+    lengths = ((8 * aad_length) << 64) | (8 * data_length)
+    s = ghash.absorb(state, lengths.to_bytes(16, 'big'))
+    tag = int.from_bytes(encrypt_blocks(j0.to_bytes(16, 'big')), 'big') ^ s
+    return tag.to_bytes(16, 'big')[:tag_length]
+
+
+def _check_tag_length(tag_length: int) -> None:
+    if tag_length not in TAG_LENGTHS:
+        raise ValueError(f"Invalid GCM tag length! Choose one of {TAG_LENGTHS}.")
+
+
+def _inc32(counter: int) -> int:
+    return (counter & ~0xFFFFFFFF) | ((counter + 1) & 0xFFFFFFFF)
+
+
+def gcm_encrypt(encrypt_blocks: Callable[[bytes], bytes], ghash: GHASH, nonce: bytes, plaintext: bytes,
+                associated_data: bytes = b'', tag_length: int = 16) -> Tuple[bytes, bytes]:
+    """
+    GCM authenticated encryption (NIST SP 800-38D).
+
+    :param encrypt_blocks: Function encrypting a concatenation of whole 16-byte blocks.
+    :param ghash: GHASH instance for H = E(0^128).
+    :param tag_length: Tag length in bytes, one of TAG_LENGTHS.
+    :return: (ciphertext, tag)
+    """
+    if not nonce:
+        raise ValueError("Nonce must not be empty.")
+    _check_tag_length(tag_length)
+    j0 = _initial_counter(ghash, nonce)
+    state = ghash.absorb(0, associated_data)
+    ciphertext, state = _gctr(encrypt_blocks, _inc32(j0), plaintext, ghash, state, hash_output=True)
+    return ciphertext, _tag(encrypt_blocks, ghash, j0, state, len(associated_data), len(ciphertext), tag_length)
+
+
+def gcm_decrypt(encrypt_blocks: Callable[[bytes], bytes], ghash: GHASH, nonce: bytes, ciphertext: bytes,
+                tag: bytes, associated_data: bytes = b'') -> bytes:
+    """
+    GCM authenticated decryption. Raises ValueError if the tag does not verify or its
+    length is not one of TAG_LENGTHS.
+    """
+    if not nonce:
+        raise ValueError("Nonce must not be empty.")
+    _check_tag_length(len(tag))
+    j0 = _initial_counter(ghash, nonce)
+    state = ghash.absorb(0, associated_data)
+    plaintext, state = _gctr(encrypt_blocks, _inc32(j0), ciphertext, ghash, state, hash_output=False)
+    expected = _tag(encrypt_blocks, ghash, j0, state, len(associated_data), len(ciphertext), len(tag))
+    if not hmac.compare_digest(expected, tag):
+        raise ValueError("GCM authentication failed.")
+    return plaintext
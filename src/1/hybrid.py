@@ -0,0 +1,107 @@
+import hashlib
+import secrets
+import time
+from typing import Optional, Tuple
+
+import Part1_AES
+from Part1_AES import AES
+from Part2_RSA import RSA
+
+AES_KEY_SIZES = (16, 24, 32)
+
+
+def kdf2(secret: bytes, length: int) -> bytes:
+    """
+    KDF2 with SHA-256 (ISO 18033-2): SHA256(secret || counter) for counter = 1, 2, ...
+    """
+    out = b''.join(hashlib.sha256(secret + i.to_bytes(4, 'big')).digest()
+                   for i in range(1, -(-length // 32) + 1))
+    return out[:length]
+
+
+class HybridRSA:
+    """
+    RSA-KEM + AES-CTR. RSA only encrypts one random r < n per message; the AES key and
+    the initial counter block are derived from r, and the payload runs through the AES
+    engine in CTR mode. Output is the encapsulation (one modulus-sized block) followed by
+    the ciphertext, which has the length of the plaintext.
+    Works with either RSA class (Part2_RSA or Part3_keyexchange). CTR is not authenticated.
+    """
+
+    def __init__(self, rsa, key_size: int = 16, engine: str = "ttable", workers: Optional[int] = None):
+        """
+        :param rsa: RSA key; only the public part is needed to encrypt.
+        :param key_size: AES key length in bytes (16, 24 or 32).
+        :param engine: AES block engine, used when numpy is not available.
+        :param workers: Processes for the CTR pass without numpy (see AES.ctr_parallel).
+        """
+        if key_size not in AES_KEY_SIZES:
+            raise ValueError(f"Invalid AES key size! Choose one of {AES_KEY_SIZES}.")
+        self.rsa = rsa
+        self.key_size = key_size
+        self.engine = engine
+        self.workers = workers
+        self.chunk_size = (rsa.n.bit_length() + 7) // 8
+
+    def _derive(self, secret: int) -> Tuple[bytes, bytes]:
+        material = kdf2(secret.to_bytes(self.chunk_size, 'big'), self.key_size + 16)
+        return material[:self.key_size], material[self.key_size:]
+
+    def encapsulate(self) -> Tuple[bytes, bytes, bytes]:
+        """
+        :return: (encapsulation, AES key, initial counter block)
+        """
+        secret = secrets.randbelow(self.rsa.n - 2) + 2
+        encapsulation = pow(secret, self.rsa.e, self.rsa.n).to_bytes(self.chunk_size, 'big')
+        return (encapsulation, *self._derive(secret))
+
+    def decapsulate(self, encapsulation: bytes) -> Tuple[bytes, bytes]:
+        """
+        Recover (AES key, initial counter block) with one CRT exponentiation.
+        """
+        c = int.from_bytes(encapsulation, 'big')
+        if len(encapsulation) != self.chunk_size or c >= self.rsa.n:
+            raise ValueError("Invalid RSA encapsulation.")
+        return self._derive(self.rsa.crt_power(c))
+
+    def _ctr(self, key: bytes, iv: bytes, data: bytes) -> bytes:
+        aes = AES(key, self.engine, cache=False)  # fresh key per message
+        if Part1_AES.np is not None:
+            return aes.ctr_bulk(data, iv)
+        return aes.ctr_parallel(data, iv, self.workers)
+
+    def encrypt(self, plaintext: bytes) -> bytes:
+        encapsulation, key, iv = self.encapsulate()
+        return encapsulation + self._ctr(key, iv, plaintext)
+
+    def decrypt(self, ciphertext: bytes) -> bytes:
+        if len(ciphertext) < self.chunk_size:
+            raise ValueError("Ciphertext shorter than the RSA encapsulation.")
+        key, iv = self.decapsulate(ciphertext[:self.chunk_size])
+        return self._ctr(key, iv, ciphertext[self.chunk_size:])
+
+
+def benchmark(bit_size: int = 512, sizes=(1024, 16 * 1024, 256 * 1024)) -> None:
+    """
+    Throughput of chunked RSA against RSA-KEM + AES-CTR for growing messages.
+    """
+    rsa = RSA(bit_size)
+    hybrid = HybridRSA(rsa)
+    print(f"RSA-{2 * bit_size}")
+    print(f"{'bytes':>8} {'RSA enc(ms)':>12} {'RSA dec(ms)':>12} {'KEM enc(ms)':>12} {'KEM dec(ms)':>12} {'dec speedup':>12}")
+    print("-" * 74)
+    for size in sizes:
+        data = secrets.token_bytes(size)
+        times = []
+        for cipher in (rsa, hybrid):
+            start = time.perf_counter()
+            ciphertext = cipher.encrypt(data)
+            middle = time.perf_counter()
+            cipher.decrypt(ciphertext)
+            times += [middle - start, time.perf_counter() - middle]
+        print(f"{size:>8} {times[0] * 1000:>12.2f} {times[1] * 1000:>12.2f} {times[2] * 1000:>12.2f} "
+              f"{times[3] * 1000:>12.2f} {times[1] / times[3]:>11.0f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
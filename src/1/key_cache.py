@@ -0,0 +1,103 @@
+import hashlib
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict
+
+#: Environment variable overriding the size of SCHEDULE_CACHE (0 disables it)
+CACHE_ENV = "CRYPTO_SCHEDULE_CACHE"
+
+
+def default_maxsize() -> int:
+    """
+    The size named by CACHE_ENV, or 256.
+    """
+    value = os.environ.get(CACHE_ENV)
+    return int(value) if value else 256
+
+
+class KeyScheduleCache:
+    """
+    Bounded LRU cache of expanded key schedules, keyed by a SHA-256 digest of
+    (cipher kind, key) so the raw keys themselves are not kept as dictionary keys.
+    Cached schedules are shared between instances, so they are stored as tuples
+    and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        """
+        :param maxsize: Maximum number of schedules kept (0 disables caching).
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def digest(kind: str, key: bytes) -> bytes:
+        return hashlib.sha256(kind.encode('ascii') + b'\0' + bytes(key)).digest()
+
+    def get(self, kind: str, key: bytes, build: Callable[[bytes], Any], cache: bool = True) -> Any:
+        """
+        Return the schedule for (kind, key), calling build(key) on a miss.
+
+        :param cache: False builds the schedule without looking it up or storing it
+            (for one-time keys that should not outlive their cipher instance).
+        """
+        if not cache or self.maxsize <= 0:
+            return build(key)
+        cache_key = KeyScheduleCache.digest(kind, key)
+        with self._lock:
+            schedule = self._entries.get(cache_key)
+            if schedule is not None:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return schedule
+            self.misses += 1
+
+        schedule = build(key)
+        with self._lock:
+            self._entries[cache_key] = schedule
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return schedule
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit/miss counters and current size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self) -> None:
+        """
+        Drop all cached schedules and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def resize(self, maxsize: int) -> None:
+        """
+        Change the capacity, evicting the least recently used schedules that no longer
+        fit; resize(0) disables the cache and drops everything it holds.
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            while self._entries and len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+
+#: Process-wide cache shared by AES and DES instances (see CACHE_ENV)
+SCHEDULE_CACHE = KeyScheduleCache(default_maxsize())
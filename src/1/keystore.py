@@ -0,0 +1,193 @@
+import base64
+import binascii
+import os
+import tempfile
+from threading import Lock
+from typing import Callable, Dict, Optional
+
+from primes import generate_prime_pair
+
+#: Environment variable naming the key store directory; keys are only written to disk when it is set
+KEYSTORE_ENV = "CRYPTO_KEYSTORE"
+
+Key = Dict[str, int]
+
+
+def default_directory() -> Optional[str]:
+    """
+    The directory named by KEYSTORE_ENV, or None (keys are kept in memory only).
+    """
+    return os.environ.get(KEYSTORE_ENV) or None
+
+
+def rsa_parameters(p: int, q: int, e: int = 65537) -> Key:
+    """
+    Full RSA private key from its primes, CRT exponents and coefficient included.
+    """
+    d = pow(e, -1, (p - 1) * (q - 1))
+    return {"n": p * q, "e": e, "d": d, "p": p, "q": q,
+            "dp": d % (p - 1), "dq": d % (q - 1), "qinv": pow(q, -1, p)}
+
+
+def encode_key(algorithm: str, size: int, seed: int, key: Key) -> bytes:
+    """
+    PEM-like text: a header naming the key, then base64 of the fields in KeyStore.FIELDS
+    order, each a 4-byte big-endian length followed by the unsigned big-endian integer.
+    """
+    body = bytearray()
+    for name in KeyStore.FIELDS[algorithm]:
+        value = key[name]
+        raw = value.to_bytes((value.bit_length() + 7) // 8, 'big')
+        body += len(raw).to_bytes(4, 'big') + raw
+    text = base64.b64encode(bytes(body)).decode('ascii')
+    label = algorithm.upper()
+    lines = [f"-----BEGIN {label} KEY-----", f"Size: {size}", f"Seed: {seed}", ""]
+    lines += [text[i:i + 64] for i in range(0, len(text), 64)]
+    lines.append(f"-----END {label} KEY-----")
+    return ("\n".join(lines) + "\n").encode('ascii')
+
+
+def decode_key(algorithm: str, data: bytes) -> Key:
+    """
+    Inverse of encode_key. Raises ValueError on a malformed or truncated file.
+    """
+    lines = data.decode('ascii').strip().split("\n")
+    label = algorithm.upper()
+    if lines[0] != f"-----BEGIN {label} KEY-----" or lines[-1] != f"-----END {label} KEY-----":
+        raise ValueError(f"Not a {label} key.")
+    try:
+        body = base64.b64decode("".join(lines[lines.index("") + 1:-1]), validate=True)
+    except binascii.Error as exc:
+        raise ValueError("Corrupt key body.") from exc
+    key, offset = {}, 0
+    for name in KeyStore.FIELDS[algorithm]:
+        length = int.from_bytes(body[offset:offset + 4], 'big')
+        raw = body[offset + 4:offset + 4 + length]
+        if offset + 4 + length > len(body):
+            raise ValueError("Truncated key.")
+        key[name] = int.from_bytes(raw, 'big')
+        offset += 4 + length
+    return key
+
+
+class KeyStore:
+    """
+    On-disk store of generated public-key material, one file per (algorithm, size, seed,
+    variant); the variant holds further parameters of the key (e.g. "e65537" for RSA).
+    Files are only read when a key is requested and are then kept in memory; a file
+    whose fields are not consistent with its p, q and e is regenerated. Keys are
+    written atomically with owner-only permissions (0600), so concurrent processes
+    asking for the same key at worst generate it twice.
+    """
+
+    #: Fields saved per algorithm (RSA keeps its CRT parameters; they are checked against p, q, e on load)
+    FIELDS = {
+        "rsa": ("n", "e", "d", "p", "q", "dp", "dq", "qinv"),
+        "dh": ("p", "g", "x", "y"),
+        "dsa": ("p", "q", "g", "x", "y"),
+    }
+
+    def __init__(self, directory: Optional[str]):
+        """
+        :param directory: Where keys are kept (None keeps them in memory only).
+        """
+        self.directory = directory
+        self._keys = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, algorithm: str, size: int, seed: int, variant: str = "") -> str:
+        suffix = f"-{variant}" if variant else ""
+        return os.path.join(self.directory, f"{algorithm}-{size}-{seed}{suffix}.pem")
+
+    def load(self, algorithm: str, size: int, seed: int, variant: str = "") -> Optional[Key]:
+        """
+        The stored key, or None if it was never saved or the file is unreadable.
+        """
+        if algorithm not in KeyStore.FIELDS:
+            raise ValueError(f"Unknown algorithm {algorithm!r}.")
+        with self._lock:
+            key = self._keys.get((algorithm, size, seed, variant))
+        if key is not None or self.directory is None:
+            return key
+        try:
+            with open(self.path(algorithm, size, seed, variant), 'rb') as f:
+                key = decode_key(algorithm, f.read())
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._keys[(algorithm, size, seed, variant)] = key
+        return key
+
+    def save(self, algorithm: str, size: int, seed: int, key: Key, variant: str = "") -> None:
+        with self._lock:
+            self._keys[(algorithm, size, seed, variant)] = key
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            os.fchmod(fd, 0o600)  # private keys: owner only, whatever the umask
+            with os.fdopen(fd, 'wb') as f:
+                f.write(encode_key(algorithm, size, seed, key))
+            os.replace(tmp_path, self.path(algorithm, size, seed, variant))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, algorithm: str, size: int, seed: Optional[int], build: Callable[[], Key],
+            valid: Callable[[Key], bool] = lambda key: True, variant: str = "") -> Key:
+        """
+        Return the stored key for (algorithm, size, seed, variant), calling build() and
+        saving the result on a miss. Keys with seed None are random and never stored.
+
+        :param valid: Stored keys failing this check are rebuilt and overwritten.
+        """
+        if seed is None:
+            return build()
+        key = self.load(algorithm, size, seed, variant)
+        if key is not None and valid(key):
+            self.hits += 1
+            return key
+        self.misses += 1
+        key = build()
+        self.save(algorithm, size, seed, key, variant)
+        return key
+
+    def rsa(self, bit_size: int, seed: Optional[int], e: int = 65537) -> Key:
+        """
+        RSA key with primes of bit_size bits from primes.generate_prime_pair(bit_size, seed, e),
+        stored per public exponent (file rsa-{bit_size}-{seed}-e{e}.pem).
+        """
+        return self.get("rsa", bit_size, seed,
+                        lambda: rsa_parameters(*generate_prime_pair(bit_size, seed, e), e),
+                        lambda key: key["e"] == e and KeyStore._rsa_consistent(key), f"e{e}")
+
+    @staticmethod
+    def _rsa_consistent(key: Key) -> bool:
+        """
+        Re-derive every private field from p, q and e; a stored key that differs in any
+        field (e.g. a corrupted dp) is rejected instead of decrypting to garbage.
+        """
+        try:
+            return rsa_parameters(key["p"], key["q"], key["e"]) == key
+        except ValueError:  # e not invertible modulo (p - 1)(q - 1)
+            return False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "loaded": len(self._keys)}
+
+    def clear(self) -> None:
+        """
+        Forget the keys loaded in memory (files are kept) and reset the counters.
+        """
+        with self._lock:
+            self._keys.clear()
+            self.hits = self.misses = 0
+
+
+#: Process-wide key store (see KEYSTORE_ENV)
+KEY_STORE = KeyStore(default_directory())
@@ -0,0 +1,258 @@
+import argparse
+import os
+import resource
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from Part1_AES import AES
+from Part1_DES import DES
+
+#: Keys handed to a worker per task
+CHUNK_KEYS = 1 << 14
+
+CIPHERS = ("des", "aes")
+
+Pair = Tuple[bytes, bytes]
+
+
+# -----------------------------------------------------------------------------
+#                       REDUCED KEY SPACES
+# -----------------------------------------------------------------------------
+
+def key_bytes(cipher: str, index: int) -> bytes:
+    """
+    Key number `index` of a reduced key space.
+    DES: the index fills the 7 effective bits of each key byte from the right (parity bits stay 0).
+    AES: AES-128 key whose low-order bits are the index (a truncated key).
+    """
+    if cipher == "des":
+        return bytes(((index >> (7 * (7 - j))) & 0x7F) << 1 for j in range(8))
+    return index.to_bytes(16, 'big')
+
+
+def _key_run(cipher: str, start: int, stop: int) -> bytes:
+    return b''.join(key_bytes(cipher, index) for index in range(start, stop))
+
+
+def half_values(cipher: str, block: bytes, start: int, stop: int, decrypt: bool, method: str) -> np.ndarray:
+    """
+    E_k(block) (or D_k(block)) for keys start..stop-1, truncated to the leading 64 bits.
+    DES runs all keys through the bitsliced engine at once; AES computes each schedule
+    directly, bypassing key_cache so a sweep does not flush it.
+    """
+    if cipher == "des":
+        out = DES.crypt_keys_bitsliced(block, _key_run(cipher, start, stop), method, decrypt)
+        return np.frombuffer(out, dtype='>u8').astype(np.uint64)
+    values = np.empty(stop - start, dtype=np.uint64)
+    for i, index in enumerate(range(start, stop)):
+        expanded_key, decryption_key = AES.build_key_schedules(key_bytes(cipher, index))
+        if decrypt:
+            out = AES.decrypt_block_ttable(block, decryption_key, 10)
+        else:
+            out = AES.encrypt_block_ttable(block, expanded_key, 10)
+        values[i] = int.from_bytes(out[:8], 'big')
+    return values
+
+
+def double_encrypt(cipher: str, k1: int, k2: int, block: bytes, method: str = "standard") -> bytes:
+    """
+    Reference double encryption E_k2(E_k1(block)) in the reduced key space.
+    """
+    if cipher == "des":
+        return DES(key_bytes(cipher, k2), method).encrypt_block(DES(key_bytes(cipher, k1), method).encrypt_block(block))
+    first, _ = AES(key_bytes(cipher, k1)).block_functions()
+    second, _ = AES(key_bytes(cipher, k2)).block_functions()
+    return second(first(block))
+
+
+# -----------------------------------------------------------------------------
+#                       FORWARD TABLE
+# -----------------------------------------------------------------------------
+
+class ForwardTable:
+    """
+    Middle values E_k1(P1) of every first-stage key, sorted: two parallel arrays of
+    uint64 truncated values and key indices (uint32 while the key space allows it).
+    Lookups are batched binary searches (np.searchsorted). The arrays can be written
+    as .npy files and memory-mapped back, so the table need not fit in RAM and worker
+    processes share the pages instead of receiving a pickled copy.
+    """
+
+    def __init__(self, values: np.ndarray, keys: np.ndarray):
+        order = np.argsort(values, kind='stable')
+        self.values = values[order]
+        self.keys = keys[order]
+
+    @classmethod
+    def from_arrays(cls, values: np.ndarray, keys: np.ndarray) -> "ForwardTable":
+        """
+        Wrap arrays that are already sorted (e.g. memory-mapped files).
+        """
+        table = cls.__new__(cls)
+        table.values, table.keys = values, keys
+        return table
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.keys.nbytes
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "values.npy"), self.values)
+        np.save(os.path.join(directory, "keys.npy"), self.keys)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "ForwardTable":
+        mode = 'r' if mmap else None
+        return cls.from_arrays(np.load(os.path.join(directory, "values.npy"), mmap_mode=mode),
+                               np.load(os.path.join(directory, "keys.npy"), mmap_mode=mode))
+
+    def lookup(self, values: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        Match a batch of backward values against the table.
+
+        :return: (position in `values`, first-stage key) for every hit, duplicates included.
+        """
+        left = np.searchsorted(self.values, values, side='left')
+        right = np.searchsorted(self.values, values, side='right')
+        hits = []
+        for position in np.nonzero(right > left)[0]:
+            for k1 in self.keys[left[position]:right[position]]:
+                hits.append((int(position), int(k1)))
+        return hits
+
+
+# -----------------------------------------------------------------------------
+#                       WORKERS
+# -----------------------------------------------------------------------------
+
+_worker_table: Optional[ForwardTable] = None
+_worker_config: tuple = ()
+
+
+def _init_worker(config: tuple, table_dir: Optional[str], table: Optional[ForwardTable]) -> None:
+    """
+    Process-pool initializer: the forward table is mapped from disk (or unpickled) once per worker.
+    """
+    global _worker_table, _worker_config
+    _worker_config = config
+    _worker_table = ForwardTable.load(table_dir) if table_dir else table
+
+
+def _forward_chunk(task: tuple) -> Tuple[np.ndarray, np.ndarray]:
+    cipher, plaintext, start, stop, method = task
+    return half_values(cipher, plaintext, start, stop, False, method), np.arange(start, stop, dtype=np.uint64)
+
+
+def _backward_chunk(task: Tuple[int, int]) -> List[Tuple[int, int]]:
+    cipher, pairs, method = _worker_config
+    start, stop = task
+    (_, c1), (p2, c2) = pairs[0], pairs[1]
+    candidates = []
+    for position, k1 in _worker_table.lookup(half_values(cipher, c1, start, stop, True, method)):
+        k2 = start + position
+        if double_encrypt(cipher, k1, k2, p2, method) == c2:
+            candidates.append((k1, k2))
+    return candidates
+
+
+# -----------------------------------------------------------------------------
+#                       ATTACK AND MEASUREMENTS
+# -----------------------------------------------------------------------------
+
+def _ranges(size: int, chunk: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + chunk, size)) for start in range(0, size, chunk)]
+
+
+def build_table(cipher: str, plaintext: bytes, bits: int, workers: Optional[int] = None,
+                method: str = "standard") -> ForwardTable:
+    """
+    Encrypt the plaintext under all 2^bits first-stage keys (in parallel) and sort.
+    """
+    size = 1 << bits
+    tasks = [(cipher, plaintext, start, stop, method) for start, stop in _ranges(size, CHUNK_KEYS)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = list(executor.map(_forward_chunk, tasks))
+    values = np.concatenate([values for values, _ in parts])
+    keys = np.concatenate([keys for _, keys in parts]).astype(np.uint32 if bits <= 32 else np.uint64)
+    return ForwardTable(values, keys)
+
+
+def attack(cipher: str, pairs: List[Pair], bits: int, workers: Optional[int] = None,
+           table_dir: Optional[str] = None, method: str = "standard") -> Tuple[List[Tuple[int, int]], Dict]:
+    """
+    Meet-in-the-middle on double encryption with two reduced key spaces of 2^bits keys each.
+    The first pair builds and matches the table; the second pair filters false matches.
+
+    :param table_dir: Write the forward table there and memory-map it in the workers.
+    :return: (surviving (k1, k2) index pairs, measurements)
+    """
+    if len(pairs) < 2:
+        raise ValueError("Need two known plaintext/ciphertext pairs.")
+    size = 1 << bits
+    start = time.perf_counter()
+    table = build_table(cipher, pairs[0][0], bits, workers, method)
+    forward_time = time.perf_counter() - start
+    table_bytes = table.nbytes
+    if table_dir:
+        table.save(table_dir)
+        table = None
+
+    start = time.perf_counter()
+    candidates = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=((cipher, pairs[:2], method), table_dir, table)) as executor:
+        for found in executor.map(_backward_chunk, _ranges(size, CHUNK_KEYS)):
+            candidates.extend(found)
+    backward_time = time.perf_counter() - start
+    stats = {
+        "bits": bits,
+        "table_bytes": table_bytes,
+        "forward_us_per_key": forward_time / size * 1e6,
+        "backward_us_per_key": backward_time / size * 1e6,
+        "seconds": forward_time + backward_time,
+        "peak_rss_kib": max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss),
+    }
+    return candidates, stats
+
+
+def measure(cipher: str, bit_sizes: List[int], workers: Optional[int] = None,
+            table_dir: Optional[str] = None, method: str = "standard") -> None:
+    """
+    Print memory and time-per-key as the key space grows, for random secret keys.
+    """
+    print(f"{'bits':>4} {'keys':>10} {'table(KiB)':>11} {'fwd(us/key)':>12} {'bwd(us/key)':>12} "
+          f"{'total(s)':>9} {'rss(KiB)':>9} found")
+    print("-" * 80)
+    for bits in bit_sizes:
+        k1, k2 = secrets.randbelow(1 << bits), secrets.randbelow(1 << bits)
+        plaintexts = [secrets.token_bytes(8), secrets.token_bytes(8)]
+        if cipher == "aes":
+            plaintexts = [p + secrets.token_bytes(8) for p in plaintexts]
+        pairs = [(p, double_encrypt(cipher, k1, k2, p, method)) for p in plaintexts]
+        candidates, stats = attack(cipher, pairs, bits, workers, table_dir, method)
+        print(f"{bits:>4} {1 << bits:>10} {stats['table_bytes'] / 1024:>11.1f} "
+              f"{stats['forward_us_per_key']:>12.2f} {stats['backward_us_per_key']:>12.2f} "
+              f"{stats['seconds']:>9.2f} {stats['peak_rss_kib']:>9} {(k1, k2) in candidates}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Meet-in-the-middle against double DES / double AES "
+                                                 "with reduced key spaces.")
+    parser.add_argument("-c", "--cipher", choices=list(CIPHERS), default="des")
+    parser.add_argument("-b", "--bits", type=int, nargs="+", default=[8, 10, 12, 14, 16],
+                        help="key bits per stage (one measurement per value)")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("--mmap", metavar="DIR", help="keep the forward table in memory-mapped files in DIR")
+    parser.add_argument("--method", choices=list(DES.METHODS), default="standard", help="DES Feistel function")
+    args = parser.parse_args()
+    measure(args.cipher, args.bits, args.workers, args.mmap, args.method)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+BlockFunction = Callable[[bytes], bytes]
+
+
+class BlockModeStream(ABC):
+    """
+    Base class for incremental block-cipher modes.
+    Data is fed in arbitrary pieces with update(); each call returns the output that
+    is ready so far and finalize() returns the rest. Only a partial block is buffered,
+    so memory use does not grow with the stream length.
+    """
+
+    def __init__(self, encrypt_block: BlockFunction, decrypt_block: Optional[BlockFunction], block_size: int):
+        """
+        :param encrypt_block: Function encrypting one block (bytes -> bytes).
+        :param decrypt_block: Function decrypting one block (only needed by ECB/CBC decryption).
+        :param block_size: Block size of the cipher in bytes.
+        """
+        self.encrypt_block = encrypt_block
+        self.decrypt_block = decrypt_block
+        self.block_size = block_size
+        self._buffer = bytearray()
+        self._finalized = False
+
+    def _check_open(self) -> None:
+        if self._finalized:
+            raise ValueError("Stream is already finalized.")
+
+    @abstractmethod
+    def update(self, data: bytes) -> bytes:
+        """
+        Process the next piece of the stream and return the output produced by it.
+        """
+
+    @abstractmethod
+    def finalize(self) -> bytes:
+        """
+        Flush the buffered data and close the stream.
+        """
+
+
+# -----------------------------------------------------------------------------
+#                                   ECB / CBC
+# -----------------------------------------------------------------------------
+
+class _PaddedEncryptor(BlockModeStream):
+    """
+    Encrypts full blocks as soon as they are available and PKCS7-pads the tail in finalize().
+    """
+
+    @abstractmethod
+    def _process(self, block: bytes) -> bytes:
+        """
+        Encrypt one full block.
+        """
+
+    def update(self, data: bytes) -> bytes:
+        self._check_open()
+        buffer = self._buffer
+        buffer += data
+        block_size = self.block_size
+        usable = len(buffer) - len(buffer) % block_size
+        if not usable:
+            return b''
+        out = [self._process(bytes(buffer[i:i + block_size])) for i in range(0, usable, block_size)]
+        del buffer[:usable]
+        return b''.join(out)
+
+    def finalize(self) -> bytes:
+        self._check_open()
+        padding_length = self.block_size - len(self._buffer)
+        block = bytes(self._buffer) + bytes([padding_length] * padding_length)
+        self._buffer.clear()
+        self._finalized = True
+        return self._process(block)
+
+
+class _PaddedDecryptor(BlockModeStream):
+    """
+    Decrypts full blocks but always holds back the last one, which carries the PKCS7 padding;
+    finalize() raises ValueError if that padding is malformed.
+    """
+
+    @abstractmethod
+    def _process(self, block: bytes) -> bytes:
+        """
+        Decrypt one full block.
+        """
+
+    def update(self, data: bytes) -> bytes:
+        self._check_open()
+        buffer = self._buffer
+        buffer += data
+        block_size = self.block_size
+        # keep at least one (possibly complete) block for finalize()
+        usable = len(buffer) - block_size
+        usable -= usable % block_size
+        if usable <= 0:
+            return b''
+        out = [self._process(bytes(buffer[i:i + block_size])) for i in range(0, usable, block_size)]
+        del buffer[:usable]
+        return b''.join(out)
+
+    def finalize(self) -> bytes:
+        self._check_open()
+        self._finalized = True
+        if not self._buffer:
+            return b''
+        if len(self._buffer) != self.block_size:
+            raise ValueError("Ciphertext length is not a multiple of the block size.")
+        plaintext = self._process(bytes(self._buffer))
+        self._buffer.clear()
+        padding_length = plaintext[-1]
+        if not 1 <= padding_length <= self.block_size or \
+                plaintext[-padding_length:] != bytes([padding_length] * padding_length):
+            raise ValueError("Invalid PKCS7 padding (wrong key or corrupted ciphertext).")
+        return plaintext[:-padding_length]
+
+
+class ECBEncryptor(_PaddedEncryptor):
+    def _process(self, block: bytes) -> bytes:
+        return self.encrypt_block(block)
+
+
+class ECBDecryptor(_PaddedDecryptor):
+    def _process(self, block: bytes) -> bytes:
+        return self.decrypt_block(block)
+
+
+class CBCEncryptor(_PaddedEncryptor):
+    def __init__(self, encrypt_block: BlockFunction, decrypt_block: Optional[BlockFunction], block_size: int, iv: bytes):
+        super().__init__(encrypt_block, decrypt_block, block_size)
+        if len(iv) != block_size:
+            raise ValueError(f"IV must be {block_size} bytes.")
+        self._previous = int.from_bytes(iv, 'big')
+
+    def _process(self, block: bytes) -> bytes:
+        mixed = (int.from_bytes(block, 'big') ^ self._previous).to_bytes(self.block_size, 'big')
+        encrypted = self.encrypt_block(mixed)
+        self._previous = int.from_bytes(encrypted, 'big')
+        return encrypted
+
+
+class CBCDecryptor(_PaddedDecryptor):
+    def __init__(self, encrypt_block: BlockFunction, decrypt_block: Optional[BlockFunction], block_size: int, iv: bytes):
+        super().__init__(encrypt_block, decrypt_block, block_size)
+        if len(iv) != block_size:
+            raise ValueError(f"IV must be {block_size} bytes.")
+        self._previous = int.from_bytes(iv, 'big')
+
+    def _process(self, block: bytes) -> bytes:
+        decrypted = int.from_bytes(self.decrypt_block(block), 'big') ^ self._previous
+        self._previous = int.from_bytes(block, 'big')
+        return decrypted.to_bytes(self.block_size, 'big')
+
+
+# -----------------------------------------------------------------------------
+#                                     CTR
+# -----------------------------------------------------------------------------
+
+class CTRCipher(BlockModeStream):
+    """
+    Counter mode. The initial counter block is the IV, incremented as a big-endian
+    integer (mod 2^(8*block_size)) for every block. Encryption and decryption are the
+    same operation and no padding is used.
+    """
+
+    def __init__(self, encrypt_block: BlockFunction, decrypt_block: Optional[BlockFunction], block_size: int, iv: bytes):
+        super().__init__(encrypt_block, decrypt_block, block_size)
+        if len(iv) != block_size:
+            raise ValueError(f"Initial counter block must be {block_size} bytes.")
+        self._counter = int.from_bytes(iv, 'big')
+        self._counter_mask = (1 << (8 * block_size)) - 1
+        self._keystream = b''
+
+    def keystream(self, num_blocks: int) -> bytes:
+        """
+        Produce the keystream of the next num_blocks counter blocks.
+        """
+        block_size = self.block_size
+        mask = self._counter_mask
+        counter = self._counter
+        encrypt_block = self.encrypt_block
+        out = []
+        for _ in range(num_blocks):
+            out.append(encrypt_block(counter.to_bytes(block_size, 'big')))
+            counter = (counter + 1) & mask
+        self._counter = counter
+        return b''.join(out)
+
+    def update(self, data: bytes) -> bytes:
+        self._check_open()
+        length = len(data)
+        if not length:
+            return b''
+        keystream = self._keystream
+        if len(keystream) < length:
+            missing = length - len(keystream)
+            keystream += self.keystream(-(-missing // self.block_size))
+        self._keystream = keystream[length:]
+        xored = int.from_bytes(data, 'big') ^ int.from_bytes(keystream[:length], 'big')
+        return xored.to_bytes(length, 'big')
+
+    def finalize(self) -> bytes:
+        self._check_open()
+        self._finalized = True
+        self._keystream = b''
+        return b''
+
+
+MODES = ("ecb", "cbc", "ctr")
+
+
+def encryptor(mode: str, encrypt_block: BlockFunction, decrypt_block: Optional[BlockFunction],
+              block_size: int, iv: Optional[bytes] = None) -> BlockModeStream:
+    """
+    Create a streaming encryptor.
+
+    :param mode: "ecb", "cbc" or "ctr".
+    :param iv: IV (CBC) or initial counter block (CTR), block_size bytes. Unused for ECB.
+    """
+    if mode == "ecb":
+        return ECBEncryptor(encrypt_block, decrypt_block, block_size)
+    if mode in ("cbc", "ctr") and iv is None:
+        raise ValueError(f"{mode.upper()} mode needs an IV.")
+    if mode == "cbc":
+        return CBCEncryptor(encrypt_block, decrypt_block, block_size, iv)
+    if mode == "ctr":
+        return CTRCipher(encrypt_block, decrypt_block, block_size, iv)
+    raise ValueError(f"Invalid mode! Choose one of {MODES}.")
+
+
+def decryptor(mode: str, encrypt_block: BlockFunction, decrypt_block: Optional[BlockFunction],
+              block_size: int, iv: Optional[bytes] = None) -> BlockModeStream:
+    """
+    Create a streaming decryptor. Arguments are the same as for encryptor().
+    """
+    if mode == "ecb":
+        return ECBDecryptor(encrypt_block, decrypt_block, block_size)
+    if mode in ("cbc", "ctr") and iv is None:
+        raise ValueError(f"{mode.upper()} mode needs an IV.")
+    if mode == "cbc":
+        return CBCDecryptor(encrypt_block, decrypt_block, block_size, iv)
+    if mode == "ctr":
+        return CTRCipher(encrypt_block, decrypt_block, block_size, iv)
+    raise ValueError(f"Invalid mode! Choose one of {MODES}.")
@@ -0,0 +1,240 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from math import gcd
+from typing import List, Optional, Tuple
+
+#: Candidates are sieved against every prime below this bound before Miller-Rabin
+SIEVE_BOUND = 1 << 20
+
+#: Below this size a process pool costs more than the search itself
+PARALLEL_MIN_BITS = 512
+
+
+def small_primes(bound: int) -> List[int]:
+    """
+    Sieve of Eratosthenes: all primes below bound.
+    """
+    sieve = bytearray([1]) * bound
+    sieve[:2] = b'\x00\x00'
+    for i in range(2, int(bound ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, bound, i)))
+    return [i for i in range(bound) if sieve[i]]
+
+
+#: Primes used for trial division in is_probable_prime
+SMALL_PRIMES = small_primes(1 << 10)
+
+
+def _prime_groups(primes: List[int], group_bits: int = 1024) -> List[Tuple[int, List[int]]]:
+    """
+    Split the odd sieving primes into groups whose product fits in about group_bits bits.
+    A candidate is reduced modulo each product once, so the per-prime remainders are
+    computed on small integers instead of on the full candidate.
+    """
+    groups, group, product = [], [], 1
+    for p in primes[1:]:
+        if product.bit_length() + p.bit_length() > group_bits:
+            groups.append((product, group))
+            group, product = [], 1
+        group.append(p)
+        product *= p
+    if group:
+        groups.append((product, group))
+    return groups
+
+
+@lru_cache(maxsize=None)
+def sieve_groups() -> List[Tuple[int, List[int]]]:
+    """
+    Grouped sieving primes below SIEVE_BOUND, built on first use (about 0.2 s).
+    """
+    return _prime_groups(small_primes(SIEVE_BOUND))
+
+
+def miller_rabin_rounds(bits: int) -> int:
+    """
+    Rounds giving an error probability below 2^-80 for a random odd candidate of this
+    size (the table OpenSSL uses for prime generation; HAC 4.49).
+    """
+    if bits >= 3747:
+        return 3
+    if bits >= 1345:
+        return 4
+    if bits >= 476:
+        return 5
+    if bits >= 400:
+        return 6
+    if bits >= 347:
+        return 7
+    if bits >= 308:
+        return 8
+    if bits >= 55:
+        return 27
+    return 34
+
+
+def _miller_rabin(n: int, base: int, d: int, s: int) -> bool:
+    x = pow(base, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def is_probable_prime(n: int, rounds: Optional[int] = None, rng: Optional[random.Random] = None) -> bool:
+    """
+    Trial division by the small-prime table, then Miller-Rabin. Base 2 runs first, so
+    almost every composite is rejected after a single exponentiation; the remaining
+    rounds use random bases drawn from rng.
+    """
+    if n < 2:
+        return False
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    if n < SMALL_PRIMES[-1] ** 2:
+        return True
+    d, s = n - 1, 0
+    while not d & 1:
+        d >>= 1
+        s += 1
+    if not _miller_rabin(n, 2, d, s):
+        return False
+    rng = rng or random.Random()
+    for _ in range((rounds or miller_rabin_rounds(n.bit_length())) - 1):
+        if not _miller_rabin(n, rng.randrange(3, n - 1), d, s):
+            return False
+    return True
+
+
+def _window_rng(bits: int, seed: Optional[int], label: str, index: int) -> random.Random:
+    """
+    Deterministic Mersenne Twister stream for an explicit seed (reproducible test keys);
+    the operating system's CSPRNG when seed is None.
+    """
+    if seed is None:
+        return random.SystemRandom()
+    return random.Random(f"{seed}:{bits}:{label}:{index}")
+
+
+def window_prime(bits: int, seed: Optional[int], label: str, index: int, e: int = 65537) -> Optional[int]:
+    """
+    Search window number `index`: `bits` odd candidates from a random start (seeded, or from
+    the OS CSPRNG for seed None) with the two top bits set (so a product of two such primes
+    has exactly 2*bits bits).
+    The window is sieved with the primes below SIEVE_BOUND, then survivors are tested in order.
+
+    :return: The first prime p of the window with gcd(e, p - 1) = 1, or None.
+    """
+    rng = _window_rng(bits, seed, label, index)
+    start = rng.getrandbits(bits) | (3 << (bits - 2)) | 1
+    size = bits
+    # sieve[j] stands for start + 2j
+    sieve = bytearray([1]) * size
+    for product, group in sieve_groups():
+        residue = start % product
+        for p in group:
+            # first j with start + 2j = 0 (mod p)
+            j = (p - residue % p) * ((p + 1) >> 1) % p
+            sieve[j::p] = bytes(len(range(j, size, p)))
+    if start < SIEVE_BOUND:  # tiny sizes: a small prime sieves itself out
+        sieve = bytearray([1]) * size
+    for j in range(size):
+        if not sieve[j]:
+            continue
+        candidate = start + 2 * j
+        if candidate.bit_length() != bits:
+            break
+        if gcd(e, candidate - 1) != 1:
+            continue
+        if is_probable_prime(candidate, rng=rng):
+            return candidate
+    return None
+
+
+def _window_task(task: tuple) -> Optional[int]:
+    return window_prime(*task)
+
+
+def generate_primes(bits: int, labels: Tuple[str, ...], seed: Optional[int] = None, e: int = 65537,
+                    workers: Optional[int] = None) -> List[int]:
+    """
+    One random prime per label. Each label walks its own sequence of windows and takes
+    the prime from the first window that has one, so with a seed the result depends only on
+    (bits, seed, label, e) and not on the number of workers. Windows of all labels that are
+    still open are searched concurrently in a process pool.
+
+    :param seed: None draws every window start from random.SystemRandom (for real keys);
+        an explicit seed is reproducible but not cryptographically secure.
+    :param workers: Pool size (default: CPU count); 1 searches in this process.
+    """
+    if bits < 8:
+        raise ValueError("Prime size must be at least 8 bits.")
+    workers = workers or os.cpu_count() or 1
+    found = {}
+    next_index = dict.fromkeys(labels, 0)
+
+    def batch() -> List[tuple]:
+        # round-robin over the open labels, at least one window each
+        tasks = []
+        while len(tasks) < max(workers, len(next_index)):
+            for label in next_index:
+                tasks.append((bits, seed, label, next_index[label], e))
+                next_index[label] += 1
+        return tasks
+
+    def collect(tasks: List[tuple], results: List[Optional[int]]) -> None:
+        # tasks of a label appear in index order, so the first hit is the lowest window
+        for task, prime in zip(tasks, results):
+            label = task[2]
+            if prime is not None and label in next_index:
+                found[label] = prime
+                del next_index[label]
+
+    if workers == 1 or bits < PARALLEL_MIN_BITS:
+        while next_index:
+            tasks = batch()
+            collect(tasks, [window_prime(*task) for task in tasks])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while next_index:
+                tasks = batch()
+                collect(tasks, list(executor.map(_window_task, tasks)))
+    return [found[label] for label in labels]
+
+
+def generate_prime_pair(bits: int, seed: Optional[int] = None, e: int = 65537,
+                        workers: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Distinct RSA primes p and q of `bits` bits each, searched concurrently, with e invertible
+    modulo p - 1 and q - 1.
+    """
+    p, q = generate_primes(bits, ("p", "q"), seed, e, workers)
+    attempt = 0
+    while p == q:
+        attempt += 1
+        q, = generate_primes(bits, (f"q{attempt}",), seed, e, workers)
+    return p, q
+
+
+def benchmark(bit_sizes=(512, 1024, 1536, 2048, 3840), seed: int = 42) -> None:
+    """
+    Time to generate one prime pair per size (RSA modulus of twice the size).
+    """
+    print(f"{'prime bits':>10} {'modulus':>8} {'seconds':>9}")
+    print("-" * 30)
+    for bits in bit_sizes:
+        start = time.perf_counter()
+        generate_prime_pair(bits, seed)
+        print(f"{bits:>10} {2 * bits:>8} {time.perf_counter() - start:>9.2f}")
+
+
+if __name__ == "__main__":
+    benchmark()